@@ -0,0 +1 @@
+@python "%~dp0analogizer_tools.py" %*
@@ -0,0 +1,93 @@
+"""analogizer-tools: one entry point for every script in tools/.
+
+Each subcommand imports its module only when it is run, so the headless
+tools never load tkinter, PyQt5 or PIL. The remaining arguments are
+passed untouched to the script's own main().
+
+    analogizer-tools pll frac 74.25 96
+    analogizer-tools mra rom "Xain'd Sleena (bootleg, set 1).mra" -r roms
+    analogizer-tools assets dist
+"""
+import importlib
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# command -> (description, {subcommand: module path}) or (description, module path).
+# Paths are relative to tools/ without ".py"; a ":func" suffix names an entry
+# point that takes argv instead of reading sys.argv.
+COMMANDS = {
+    "pll": ("calculo del PLL", {
+        "frac": "frac_calc",
+        "solve": "pll_calc",
+        "mif": "gen_pll_mif",
+    }),
+    "mif": ("ficheros MIF de reconfiguracion", {
+        "parse": "parse_mif",
+        "latency": "pll_reconfig_latency",
+    }),
+    "md5": ("hashes MD5/SHA-1/CRC32 y verificacion de MRA", "calcular_md5_msgbox:main_cli"),
+    "rbf": ("invierte los bits del .rbf (xain.rbf_r)", "reverse_bits"),
+    "mra": ("ROMs a partir de MRA", {
+        "rom": "mra_rom",
+        "inspect": "rom_inspect",
+        "index": "rom_index",
+        "switches": "mra_switches",
+    }),
+    "font": ("editores de fuentes (Tk)", {
+        "mono": "font_editor/font_editor/font_editor",
+        "color": "font_editor_color/font_editor_color",
+        "transparency": "font_editor_color/check_transparency",
+    }),
+    "screen": ("editor de pantalla OSD (PyQt5)", "screen_editor/screen_editor_pyqt_02"),
+    "assets": ("ficheros de dist/ para el Pocket", {
+        "dist": "package_dist",
+        "image": "pocket_image",
+    }),
+}
+
+
+def usage():
+    lines = ["uso: analogizer-tools <comando> [subcomando] [argumentos...]", "", "comandos:"]
+    for name, (desc, target) in COMMANDS.items():
+        lines.append(f"  {name:<8} {desc}")
+        if isinstance(target, dict):
+            lines.append(f"           {' | '.join(target)}")
+    return "\n".join(lines)
+
+
+def run(target, prog, argv):
+    """Import tools/<target> and run its entry point with argv."""
+    path, _, func = target.partition(":")
+    subdir, module = os.path.split(path)
+    sys.path.insert(0, os.path.join(TOOLS_DIR, subdir))
+    mod = importlib.import_module(module)
+    if func:
+        return getattr(mod, func)(argv)
+    sys.argv = [prog] + argv
+    return mod.main()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"comando desconocido: {name}\n\n{usage()}", file=sys.stderr)
+        return 2
+    target = COMMANDS[name][1]
+    prog = f"analogizer-tools {name}"
+    if isinstance(target, dict):
+        if not rest or rest[0] not in target:
+            print(f"uso: {prog} {{{','.join(target)}}} [argumentos...]", file=sys.stderr)
+            return 0 if rest and rest[0] in ("-h", "--help") else 2
+        prog += f" {rest[0]}"
+        target, rest = target[rest[0]], rest[1:]
+    return run(target, prog, rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
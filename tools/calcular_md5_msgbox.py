@@ -1,20 +1,277 @@
+import argparse
+import glob
 import hashlib
+import json
 import os
-import tkinter as tk
-from tkinter import messagebox
-from tkinterdnd2 import DND_FILES, TkinterDnD
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
-def calcular_md5(ruta_archivo, tam_bloque=4096):
+TAM_BLOQUE = 1 << 20  # 1 MiB: hashlib y zlib liberan el GIL con bloques grandes
+CACHE_POR_DEFECTO = ".hash_cache.json"
+REFRESCO_USO = 86400  # segundos: "usado" solo se actualiza si es mas antiguo, para no reescribir la cache en cada acierto
+
+def calcular_hashes_flujo(f, tam_bloque=TAM_BLOQUE):
+    """MD5, SHA-1 y CRC32 de un flujo binario en una sola pasada de lectura."""
     md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+    crc = 0
+    buf = bytearray(tam_bloque)
+    vista = memoryview(buf)
+    tam = 0
+    while n := f.readinto(buf):
+        chunk = vista[:n]
+        md5.update(chunk)
+        sha1.update(chunk)
+        crc = zlib.crc32(chunk, crc)
+        tam += n
+    return {"md5": md5.hexdigest(), "sha1": sha1.hexdigest(), "crc32": f"{crc:08x}", "size": tam}
+
+def calcular_hashes(ruta_archivo, tam_bloque=TAM_BLOQUE):
+    with open(ruta_archivo, 'rb', buffering=0) as f:
+        return calcular_hashes_flujo(f, tam_bloque)
+
+def hashes_miembros_zip(ruta_zip, confiar_crc=True):
+    """Genera (nombre, hashes) de cada miembro de un zip sin extraer nada a disco.
+
+    Con confiar_crc se usa el CRC32 del directorio central; si no, cada
+    miembro se descomprime por bloques (zipfile comprueba ademas ese CRC).
+    """
+    with zipfile.ZipFile(ruta_zip) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            if confiar_crc:
+                yield info.filename, {"crc32": f"{info.CRC:08x}", "size": info.file_size}
+                continue
+            try:
+                with zf.open(info) as f:
+                    yield info.filename, calcular_hashes_flujo(f)
+            except (zipfile.BadZipFile, zlib.error) as e:
+                yield info.filename, {"error": str(e)}
+
+def verificar_mra(ruta_mra, rutas_roms, confiar_crc=True):
+    """Comprueba las partes que pide un MRA contra los zips indicados en su <rom zip=...>.
+
+    rutas_roms son directorios donde buscar esos zips o zips concretos.
+    Devuelve (nombre, crc, estado, zip) con estado "ok", "renombrado"
+    (el CRC existe con otro nombre), "erroneo" o "falta".
+    """
+    from mra_rom import iter_parts, parse_mra
+
+    mra = parse_mra(ruta_mra)
+    zips = []
+    for ruta in rutas_roms:
+        if os.path.isdir(ruta):
+            zips += [os.path.join(ruta, z) for z in mra["zips"] if os.path.isfile(os.path.join(ruta, z))]
+        elif os.path.isfile(ruta):
+            zips.append(ruta)
+
+    por_nombre = {}
+    por_crc = {}
+    for ruta_zip in zips:
+        for nombre, hashes in hashes_miembros_zip(ruta_zip, confiar_crc):
+            crc = hashes.get("crc32")
+            por_nombre.setdefault(nombre.lower(), (crc, ruta_zip))
+            if crc:
+                por_crc.setdefault(crc, (nombre, ruta_zip))
+
+    resultado = []
+    for part in iter_parts(mra):
+        nombre, crc = part["name"], part["crc"]
+        if nombre and nombre.lower() in por_nombre:
+            crc_real, ruta_zip = por_nombre[nombre.lower()]
+            if crc is None or crc_real == crc:
+                resultado.append((nombre, crc, "ok", ruta_zip))
+                continue
+            if crc not in por_crc:
+                resultado.append((nombre, crc, "erroneo", ruta_zip))
+                continue
+        if crc in por_crc:
+            resultado.append((nombre, crc, "renombrado", por_crc[crc][1]))
+        else:
+            resultado.append((nombre, crc, "falta", None))
+    return resultado
+
+def calcular_md5(ruta_archivo, tam_bloque=TAM_BLOQUE):
     try:
-        with open(ruta_archivo, 'rb') as f:
-            while chunk := f.read(tam_bloque):
-                md5.update(chunk)
-        return md5.hexdigest()
+        return calcular_hashes(ruta_archivo, tam_bloque)["md5"]
     except Exception as e:
         return f"[ERROR] {e}"
 
+def expandir_rutas(rutas):
+    """Ficheros a partir de una lista de ficheros, directorios (recursivo) o globs."""
+    vistos = set()
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            candidatos = []
+            for raiz, dirs, ficheros in os.walk(ruta):
+                dirs.sort()
+                candidatos.extend(os.path.join(raiz, nombre) for nombre in sorted(ficheros))
+        elif os.path.isfile(ruta):
+            candidatos = [ruta]
+        else:
+            candidatos = sorted(p for p in glob.glob(ruta, recursive=True) if os.path.isfile(p))
+            if not candidatos and glob.escape(ruta) == ruta:
+                candidatos = [ruta]  # no es un glob: se informa del error al leerlo
+        for candidato in candidatos:
+            if candidato not in vistos:
+                vistos.add(candidato)
+                yield candidato
+
+class CacheHashes:
+    """Cache persistente de hashes indexada por (ruta, tamaño, mtime_ns, inodo).
+
+    Un fichero cuyo stat coincide con la entrada guardada se devuelve sin
+    leerlo. Al guardar se descartan las entradas no usadas en max_dias y,
+    si aun quedan mas de max_entradas, las menos usadas recientemente.
+    """
+
+    def __init__(self, ruta_cache=CACHE_POR_DEFECTO, max_entradas=50000, max_dias=90):
+        self.ruta_cache = ruta_cache
+        self.max_entradas = max_entradas
+        self.max_dias = max_dias
+        self.entradas = {}
+        self.cambios = False
+        self.lock = threading.Lock()
+        try:
+            with open(ruta_cache, 'r') as f:
+                self.entradas = json.load(f)
+        except (OSError, ValueError):
+            self.entradas = {}
+
+    @staticmethod
+    def _clave(st):
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    def obtener(self, ruta, st):
+        with self.lock:
+            entrada = self.entradas.get(os.path.abspath(ruta))
+            if entrada is None or entrada["clave"] != self._clave(st):
+                return None
+            ahora = int(time.time())
+            if ahora - entrada["usado"] > REFRESCO_USO:
+                entrada["usado"] = ahora
+                self.cambios = True
+            return entrada["hashes"]
+
+    def guardar_hashes(self, ruta, st, hashes):
+        with self.lock:
+            self.entradas[os.path.abspath(ruta)] = {"clave": self._clave(st), "usado": int(time.time()),
+                                                    "hashes": hashes}
+            self.cambios = True
+
+    def compactar(self):
+        limite = time.time() - self.max_dias * 86400
+        vivas = {ruta: e for ruta, e in self.entradas.items() if e["usado"] >= limite}
+        if len(vivas) > self.max_entradas:
+            recientes = sorted(vivas.items(), key=lambda item: item[1]["usado"], reverse=True)
+            vivas = dict(recientes[:self.max_entradas])
+        if len(vivas) != len(self.entradas):
+            self.entradas = vivas
+            self.cambios = True
+
+    def guardar(self):
+        self.compactar()
+        if not self.cambios:
+            return
+        tmp = self.ruta_cache + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.entradas, f, separators=(",", ":"))
+        os.replace(tmp, self.ruta_cache)
+        self.cambios = False
+
+def calcular_hashes_con_cache(ruta, cache=None):
+    if cache is None:
+        return calcular_hashes(ruta)
+    st = os.stat(ruta)
+    hashes = cache.obtener(ruta, st)
+    if hashes is None:
+        hashes = calcular_hashes(ruta)
+        # Si el fichero cambio mientras se leia no se guarda
+        if CacheHashes._clave(os.stat(ruta)) == CacheHashes._clave(st):
+            cache.guardar_hashes(ruta, st, hashes)
+    return hashes
+
+def calcular_hashes_multiples(rutas, hilos=None, cache=None):
+    """Genera (ruta, hashes) en el orden de entrada, leyendo los ficheros en paralelo."""
+    def hash_o_error(ruta):
+        try:
+            return ruta, calcular_hashes_con_cache(ruta, cache)
+        except OSError as e:
+            return ruta, {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        yield from pool.map(hash_o_error, expandir_rutas(rutas))
+
+def main_cli(argv):
+    parser = argparse.ArgumentParser(description="Calcula MD5, SHA-1 y CRC32 de ficheros, directorios o globs")
+    parser.add_argument("rutas", nargs="*")
+    parser.add_argument("-j", "--hilos", type=int, default=None, help="numero de hilos de lectura")
+    parser.add_argument("--json", action="store_true", help="salida en JSON")
+    parser.add_argument("--cache", action="store_true", help="reutilizar hashes de ficheros sin cambios")
+    parser.add_argument("--cache-file", metavar="FICHERO",
+                        help=f"fichero de la cache (implica --cache; por defecto {CACHE_POR_DEFECTO})")
+    parser.add_argument("--zip", action="store_true", help="calcular los hashes de los miembros de cada .zip")
+    parser.add_argument("--descomprimir", action="store_true",
+                        help="no confiar en el CRC del directorio central: descomprimir y calcular")
+    parser.add_argument("--mra", help="verificar las partes del MRA contra los zips de las rutas dadas")
+    args = parser.parse_args(argv)
+
+    if args.mra:
+        resultado = verificar_mra(args.mra, args.rutas or ["."], not args.descomprimir)
+        for nombre, crc, estado, ruta_zip in resultado:
+            print(f"{estado.upper():<11} {crc or '-':<8}  {nombre or '-'}  {ruta_zip or ''}")
+        return 0 if all(estado in ("ok", "renombrado") for _, _, estado, _ in resultado) else 1
+    if not args.rutas:
+        parser.error("no se indicaron ficheros")
+    if args.zip:
+        errores = 0
+        for ruta_zip in expandir_rutas(args.rutas):
+            if not zipfile.is_zipfile(ruta_zip):
+                continue
+            for nombre, hashes in hashes_miembros_zip(ruta_zip, not args.descomprimir):
+                if "error" in hashes:
+                    errores += 1
+                    print(f"[ERROR] {ruta_zip}|{nombre}: {hashes['error']}", file=sys.stderr)
+                else:
+                    print(f"{hashes.get('md5', '-'):<32}  {hashes['crc32']}  {ruta_zip}|{nombre}")
+        return 1 if errores else 0
+
+    cache = None
+    rutas = args.rutas
+    if args.cache or args.cache_file:
+        ruta_cache = os.path.realpath(args.cache_file or CACHE_POR_DEFECTO)
+        explicitas = expandir_rutas([r for r in args.rutas if not os.path.isdir(r)])
+        if any(os.path.realpath(r) == ruta_cache for r in explicitas):
+            parser.error(f"la cache {ruta_cache} es uno de los ficheros de entrada")
+        # La propia cache no se calcula si aparece al recorrer un directorio
+        rutas = [r for r in expandir_rutas(args.rutas) if os.path.realpath(r) != ruta_cache]
+        cache = CacheHashes(ruta_cache)
+    resultados = calcular_hashes_multiples(rutas, args.hilos, cache)
+    errores = 0
+    if args.json:
+        datos = {ruta: hashes for ruta, hashes in resultados}
+        errores = sum(1 for hashes in datos.values() if "error" in hashes)
+        print(json.dumps(datos, indent=4))
+    else:
+        for ruta, hashes in resultados:
+            if "error" in hashes:
+                errores += 1
+                print(f"[ERROR] {ruta}: {hashes['error']}", file=sys.stderr)
+            else:
+                print(f"{hashes['md5']}  {hashes['sha1']}  {hashes['crc32']}  {ruta}")
+    if cache:
+        cache.guardar()
+    return 1 if errores else 0
+
 def mostrar_md5(ruta):
+    import tkinter as tk
+    from tkinter import messagebox
+
     md5 = calcular_md5(ruta)
     texto_completo = f"Archivo:\n{ruta}\n\nMD5:\n{md5}"
 
@@ -35,6 +292,8 @@ def mostrar_md5(ruta):
     btn_copiar.pack(pady=(0, 10))
 
 def procesar_archivo_drop(event):
+    from tkinter import messagebox
+
     archivo = event.data.strip().strip('{}')  # Maneja nombres con espacios
     if not os.path.isfile(archivo):
         messagebox.showerror("Error", f"No es un archivo válido:\n{archivo}")
@@ -42,6 +301,9 @@ def procesar_archivo_drop(event):
     mostrar_md5(archivo)
 
 def crear_interfaz_drag_and_drop():
+    import tkinter as tk
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+
     root = TkinterDnD.Tk()
     root.title("Arrastra un archivo aquí para calcular su MD5")
     root.geometry("500x150")
@@ -57,4 +319,6 @@ def crear_interfaz_drag_and_drop():
     root.mainloop()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main_cli(sys.argv[1:]))
     crear_interfaz_drag_and_drop()
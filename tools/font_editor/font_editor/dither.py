@@ -0,0 +1,93 @@
+# dither.py
+# Conversión de una imagen en escala de grises a bits (1 = píxel negro) para la vista 128x64
+
+import numpy as np
+
+METHODS = ("Umbral", "Otsu", "Bayer 4x4", "Bayer 8x8", "Floyd-Steinberg")
+
+def otsu_threshold(gray):
+    """Umbral que maximiza la varianza entre clases del histograma."""
+    hist = np.bincount(np.asarray(gray, dtype=np.uint8).ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(hist)                 # píxeles con valor <= t
+    total = weight[-1]
+    mean = np.cumsum(hist * levels)
+    w0, w1 = weight, total - weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * w0 - mean * total) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = 0
+    # Los píxeles < umbral son negros: el corte queda justo por encima de la clase oscura
+    return int(np.argmax(between)) + 1
+
+def bayer_matrix(n):
+    """Matriz de Bayer n x n (n potencia de 2) con valores 0..n*n-1."""
+    m = np.zeros((1, 1), dtype=np.int32)
+    while m.shape[0] < n:
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return m
+
+def threshold(gray, thresh):
+    return np.asarray(gray) < thresh
+
+def ordered(gray, thresh, n=4):
+    """Dither ordenado: el umbral varía alrededor de thresh según la matriz de Bayer."""
+    gray = np.asarray(gray, dtype=np.float32)
+    h, w = gray.shape
+    bias = (bayer_matrix(n) + 0.5) / (n * n) * 255 - 128 + thresh
+    return gray < np.tile(bias, (h // n + 1, w // n + 1))[:h, :w]
+
+_wave_cache = {}
+
+def _waves(h, w):
+    """Índices planos (en la imagen con borde) de cada frente x + 2y = k, cacheados por tamaño."""
+    key = (h, w)
+    if key not in _wave_cache:
+        ys, xs = np.mgrid[0:h, 0:w]
+        k = (xs + 2 * ys).ravel()
+        flat = (ys * (w + 2) + xs + 1).ravel()
+        order = np.argsort(k, kind="stable")
+        _wave_cache[key] = np.split(flat[order], np.flatnonzero(np.diff(k[order])) + 1)
+    return _wave_cache[key]
+
+def floyd_steinberg(gray, thresh):
+    """Difusión de error de Floyd–Steinberg.
+
+    El píxel (y, x) solo depende de píxeles con x + 2y menor, así que se
+    procesa por frentes x + 2y = k, cada uno de golpe con NumPy. La imagen
+    lleva una columna a cada lado y una fila debajo que absorben el error
+    que sale del borde."""
+    gray = np.asarray(gray, dtype=np.float32)
+    h, w = gray.shape
+    stride = w + 2
+    err = np.zeros((h + 1, stride), dtype=np.float32)
+    err[:h, 1:w + 1] = gray
+    err = err.ravel()
+    dark = np.zeros(err.size, dtype=bool)
+    # Dentro de un frente los destinos de una misma dirección no se repiten
+    for idx in _waves(h, w):
+        old = err[idx]
+        bit = old < thresh
+        dark[idx] = bit
+        e = old - np.where(bit, 0, 255)
+        err[idx + 1] += e * (7 / 16)
+        err[idx + stride - 1] += e * (3 / 16)
+        err[idx + stride] += e * (5 / 16)
+        err[idx + stride + 1] += e * (1 / 16)
+    return dark.reshape(h + 1, stride)[:h, 1:w + 1]
+
+def convert(gray, method, thresh):
+    """Bits (alto, ancho) con 1 en los píxeles oscuros; devuelve también el umbral usado."""
+    if method == "Otsu":
+        thresh = otsu_threshold(gray)
+        return threshold(gray, thresh), thresh
+    if method.startswith("Bayer"):
+        return ordered(gray, thresh, int(method.split("x")[-1])), thresh
+    if method == "Floyd-Steinberg":
+        return floyd_steinberg(gray, thresh), thresh
+    return threshold(gray, thresh), thresh
+
+def bits_to_glyphs(bits, cols=16):
+    """Bits (filas*8, cols*8) -> uint8[caracteres, 8], inverso de font_model.glyph_sheet."""
+    rows = bits.shape[0] // 8
+    glyphs = np.asarray(bits, dtype=np.uint8).reshape(rows, 8, cols, 8).transpose(0, 2, 1, 3)
+    return np.packbits(glyphs.reshape(rows * cols, 8, 8), axis=2).reshape(rows * cols, 8)
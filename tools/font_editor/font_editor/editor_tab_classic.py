@@ -55,6 +55,9 @@ class ClassicTab:
                         fill=color, outline="gray")
         self.canvas.update_idletasks()
 
+    def visible_chars(self):
+        return range(self.base_char, min(self.base_char + VISIBLE_CHARS, 128))
+
     def get_char_from_event(self, event):
         col = event.x // (FONT_WIDTH * PIXEL_SIZE)
         row = event.y // (FONT_HEIGHT * PIXEL_SIZE + 20)
@@ -69,9 +72,7 @@ class ClassicTab:
         col = (event.x % (FONT_WIDTH * PIXEL_SIZE)) // PIXEL_SIZE
         row = ((event.y % (FONT_HEIGHT * PIXEL_SIZE + 20)) - 16) // PIXEL_SIZE
         if 0 <= col < FONT_WIDTH and 0 <= row < FONT_HEIGHT:
-            byte = self.app.char_data[char][row]
-            mask = 1 << (7 - col)
-            self.app.char_data[char][row] = byte ^ mask
+            self.app.font.toggle_bit(char, row, col, source=self)
             self.selected_char = char
             self.refresh()
 
@@ -89,7 +90,7 @@ class ClassicTab:
 
     def paste_char(self):
         if self.clipboard:
-            self.app.char_data[self.selected_char] = list(self.clipboard)
+            self.app.font.set_char(self.selected_char, self.clipboard, source=self)
             self.refresh()
         else:
             messagebox.showwarning("Vacío", "No hay carácter copiado")
@@ -41,6 +41,9 @@ class ExtendedTab:
         self.upper_canvas.update_idletasks()
         self.lower_canvas.update_idletasks()
 
+    def visible_chars(self):
+        return range(128, 256)
+
     def draw_grid(self, canvas, start_char, end_char, background=None):
         canvas.delete("all")
         if background:
@@ -69,9 +72,7 @@ class ExtendedTab:
         char_row, pixel_y = divmod(y, 8)
         char_idx = (char_row * 16 + char_col) + (128 if upper else 192)
         if 128 <= char_idx < 256 and 0 <= pixel_x < 8 and 0 <= pixel_y < 8:
-            byte = self.app.char_data[char_idx][pixel_y]
-            mask = 1 << (7 - pixel_x)
-            self.app.char_data[char_idx][pixel_y] = byte ^ mask
+            self.app.font.toggle_bit(char_idx, pixel_y, pixel_x, source=self)
             self.refresh()
 
     def load_upper_image(self):
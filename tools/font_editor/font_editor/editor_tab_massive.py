@@ -1,10 +1,15 @@
 # editor_tab_massive.py
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import numpy as np
 from PIL import Image, ImageTk
 
+from dither import METHODS, bits_to_glyphs, convert
+from editor_tab_preview_dual import render_bits
+
 PIXEL_SIZE = 4
 WIDTH, HEIGHT = 128, 64
+PREVIEW_DELAY_MS = 80  # la vista previa espera a que el deslizador se detenga
 
 class MassiveTab:
     def __init__(self, app):
@@ -20,12 +25,17 @@ class MassiveTab:
         tk.Button(control, text="Generar desde imagen", command=self.generate_from_image).pack(side="left", padx=5)
         tk.Button(control, text="Limpiar todo", command=self.clear_all).pack(side="left", padx=5)
 
+        self.method = tk.StringVar(value=METHODS[0])
+        tk.OptionMenu(control, self.method, *METHODS, command=lambda e: self.schedule_preview()).pack(side="left")
+
         self.threshold = tk.IntVar(value=128)
         tk.Label(control, text="Umbral").pack(side="left")
-        tk.Scale(control, from_=0, to=255, orient="horizontal", variable=self.threshold, command=lambda e: self.refresh()).pack(side="left")
+        tk.Scale(control, from_=0, to=255, orient="horizontal", variable=self.threshold, command=lambda e: self.schedule_preview()).pack(side="left")
+        self.threshold_info = tk.Label(control, text="", width=4)
+        self.threshold_info.pack(side="left")
 
         self.invert_bits = tk.BooleanVar(value=False)
-        tk.Checkbutton(control, text="Invertir bits", variable=self.invert_bits).pack(side="left")
+        tk.Checkbutton(control, text="Invertir bits", variable=self.invert_bits, command=self.schedule_preview).pack(side="left")
         self.show_image = tk.BooleanVar(value=True)
         tk.Checkbutton(control, text="Mostrar plantilla", variable=self.show_image, command=self.refresh).pack(side="left")
 
@@ -42,7 +52,10 @@ class MassiveTab:
         tk.Button(pos_frame, text="Insertar en RAM .mem", command=self.insert_into_mem).pack(side="left", padx=5)
 
         self.img = None
+        self.gray = None
         self.imgtk = None
+        self.preview_job = None
+        self.preview_photo = None
 
         self.canvas.bind("<Button-1>", self.toggle_pixel)
         self.refresh()
@@ -52,6 +65,8 @@ class MassiveTab:
         if self.show_image.get() and self.imgtk:
             self.canvas.create_image(0, 0, anchor="nw", image=self.imgtk)
 
+        # (carácter, fila, columna) -> rectángulo, para repintar solo la celda editada
+        self.cells = {}
         for i in range(8):
             for j in range(16):
                 char_index = 128 + i * 16 + j
@@ -60,7 +75,7 @@ class MassiveTab:
                     for x in range(8):
                         bit = (byte >> (7 - x)) & 1
                         color = "black" if bit else "white"
-                        self.canvas.create_rectangle(
+                        self.cells[(char_index, y, x)] = self.canvas.create_rectangle(
                             j*8*PIXEL_SIZE + x*PIXEL_SIZE,
                             i*8*PIXEL_SIZE + y*PIXEL_SIZE,
                             j*8*PIXEL_SIZE + (x+1)*PIXEL_SIZE,
@@ -68,16 +83,22 @@ class MassiveTab:
                             fill=color, outline="gray")
         self.canvas.update_idletasks()
 
+    def visible_chars(self):
+        return range(128, 256)
+
+    def update_cell(self, char_index, y, x):
+        bit = (self.app.char_data[char_index][y] >> (7 - x)) & 1
+        self.canvas.itemconfig(self.cells[(char_index, y, x)], fill="black" if bit else "white")
+
     def toggle_pixel(self, event):
         x, y = event.x // PIXEL_SIZE, event.y // PIXEL_SIZE
         col, px = divmod(x, 8)
         row, py = divmod(y, 8)
         char_index = 128 + row * 16 + col
         if 128 <= char_index < 256 and 0 <= px < 8 and 0 <= py < 8:
-            byte = self.app.char_data[char_index][py]
-            mask = 1 << (7 - px)
-            self.app.char_data[char_index][py] = byte ^ mask
-            self.refresh()
+            self.cancel_preview()
+            self.app.font.toggle_bit(char_index, py, px, source=self)
+            self.update_cell(char_index, py, px)
 
     def load_image(self):
         path = filedialog.askopenfilename(filetypes=[("PNG", "*.png")])
@@ -85,38 +106,54 @@ class MassiveTab:
             return
         img = Image.open(path).convert("L").resize((WIDTH, HEIGHT), Image.NEAREST)
         self.img = img
-        rgba = Image.new("RGBA", img.size)
-        for y in range(img.height):
-            for x in range(img.width):
-                val = img.getpixel((x, y))
-                rgba.putpixel((x, y), (val, val, val, 128))
+        self.gray = np.asarray(img)
+        rgba = Image.merge("RGBA", (img, img, img, Image.new("L", img.size, 128)))
         self.imgtk = ImageTk.PhotoImage(rgba.resize((WIDTH*PIXEL_SIZE, HEIGHT*PIXEL_SIZE), Image.NEAREST))
         self.show_image.set(True)
         self.refresh()
 
+    def image_bits(self):
+        """Bits 64x128 de la plantilla con el método y umbral actuales (1 = negro)."""
+        bits, thresh = convert(self.gray, self.method.get(), self.threshold.get())
+        self.threshold_info.config(text=str(thresh))
+        return ~bits if self.invert_bits.get() else bits
+
+    def schedule_preview(self):
+        if self.gray is None:
+            return
+        if self.preview_job:
+            self.frame.after_cancel(self.preview_job)
+        self.preview_job = self.frame.after(PREVIEW_DELAY_MS, self.update_preview)
+
+    def cancel_preview(self):
+        if self.preview_job:
+            self.frame.after_cancel(self.preview_job)
+            self.preview_job = None
+        self.canvas.delete("preview")
+
+    def update_preview(self):
+        # Resultado sin aplicar a la fuente, como una sola imagen sobre la rejilla
+        self.preview_job = None
+        image = render_bits(self.image_bits())
+        if self.preview_photo is None:
+            self.preview_photo = ImageTk.PhotoImage(image)
+        else:
+            self.preview_photo.paste(image)
+        self.canvas.delete("preview")
+        self.canvas.create_image(0, 0, anchor="nw", image=self.preview_photo, tags="preview")
+
     def generate_from_image(self):
-        if not self.img:
+        if self.gray is None:
             return
-        thresh = self.threshold.get()
-        for y in range(HEIGHT):
-            for x in range(WIDTH):
-                val = self.img.getpixel((x, y))
-                bit = 1 if val < thresh else 0
-                if self.invert_bits.get():
-                    bit = 1 - bit
-                col, px = divmod(x, 8)
-                row, py = divmod(y, 8)
-                char_index = 128 + row * 16 + col
-                if bit:
-                    self.app.char_data[char_index][py] |= (1 << (7 - px))
-                else:
-                    self.app.char_data[char_index][py] &= ~(1 << (7 - px))
+        self.cancel_preview()
+        self.app.char_data[128:256] = bits_to_glyphs(self.image_bits())
+        self.app.font.notify(range(128, 256), source=self)
         self.refresh()
 
     def clear_all(self):
-        for i in range(128, 256):
-            for j in range(8):
-                self.app.char_data[i][j] = 0
+        self.cancel_preview()
+        self.app.char_data[128:256] = 0
+        self.app.font.notify(range(128, 256), source=self)
         self.refresh()
 
     def insert_into_mem(self):
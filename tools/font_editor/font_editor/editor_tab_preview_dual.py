@@ -1,7 +1,29 @@
 
 import tkinter as tk
+import numpy as np
+from PIL import Image, ImageTk
+
+from font_model import glyph_sheet
 
 PIXEL_SIZE = 4
+GRID_COLOR = 190  # "gray" de Tk
+_grid_cache = {}
+
+def grid_mask(height, width, pixel_size=PIXEL_SIZE):
+    """Máscara con el borde de cada celda ampliada (como el outline de los rectángulos), cacheada por tamaño."""
+    key = (height, width, pixel_size)
+    if key not in _grid_cache:
+        edge = np.zeros(pixel_size, dtype=bool)
+        edge[[0, -1]] = True
+        _grid_cache[key] = np.tile(edge, height)[:, None] | np.tile(edge, width)[None, :]
+    return _grid_cache[key]
+
+def render_bits(bits, pixel_size=PIXEL_SIZE):
+    """Imagen L ampliada: 1 = negro, 0 = blanco, con la rejilla gris superpuesta."""
+    pixels = np.where(bits, 0, 255).astype(np.uint8)
+    pixels = pixels.repeat(pixel_size, axis=0).repeat(pixel_size, axis=1)
+    pixels[grid_mask(*bits.shape, pixel_size)] = GRID_COLOR
+    return Image.fromarray(pixels, "L")
 
 class PreviewDualTab:
     def __init__(self, app):
@@ -14,25 +36,18 @@ class PreviewDualTab:
         self.canvas = tk.Canvas(self.frame, width=width, height=height, bg="white")
         self.canvas.pack()
 
+        self.photo = None
         self.refresh()
 
+    def visible_chars(self):
+        return range(256)
+
     def refresh(self):
-        self.canvas.delete("all")
-        for block in range(2):  # 0 = ASCII 0–127, 1 = ASCII 128–255
-            base = block * 128
-            for i in range(128):
-                row, col = divmod(i, 16)
-                char_index = base + i
-                for y in range(8):
-                    byte = self.app.char_data[char_index][y]
-                    for x in range(8):
-                        bit = (byte >> (7 - x)) & 1
-                        color = "black" if bit else "white"
-                        self.canvas.create_rectangle(
-                            block*16*8*PIXEL_SIZE + col*8*PIXEL_SIZE + x*PIXEL_SIZE,
-                            row*8*PIXEL_SIZE + y*PIXEL_SIZE,
-                            block*16*8*PIXEL_SIZE + col*8*PIXEL_SIZE + (x+1)*PIXEL_SIZE,
-                            row*8*PIXEL_SIZE + (y+1)*PIXEL_SIZE,
-                            fill=color, outline="gray"
-                        )
-        self.canvas.update_idletasks()
+        # 0 = ASCII 0–127 a la izquierda, 1 = ASCII 128–255 a la derecha
+        bits = np.hstack([glyph_sheet(self.app.char_data, base, 128) for base in (0, 128)])
+        image = render_bits(bits)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image)
+            self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+        else:
+            self.photo.paste(image)
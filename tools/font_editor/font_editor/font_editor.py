@@ -9,6 +9,8 @@ from tkinter import filedialog
 import sys
 import os
 
+from font_model import FontModel, format_mem, glyph_sheet, parse_mem_lines
+
 # --- Constantes generales ---
 FONT_WIDTH = 8
 FONT_HEIGHT = 8
@@ -25,8 +27,9 @@ class FontEditor:
         self.root = root
         self.root.title("Editor de fuente 8x8")
 
-        # Inicializar datos de los caracteres
-        self.char_data = [[0 for _ in range(FONT_HEIGHT)] for _ in range(NUM_CHARS)]
+        # Inicializar datos de los caracteres (compartidos con las pestañas a través del modelo)
+        self.font = FontModel()
+        self.char_data = self.font.char_data
 
         # Crear pestañas
         self.notebook = ttk.Notebook(root)
@@ -70,6 +73,13 @@ class FontEditor:
         self.build_tab3()
         self.build_tab4()
 
+        # Cada pestaña se repinta solo cuando está visible y sus caracteres han cambiado
+        self.tabs = {str(self.tab1): self.classic_tab, str(self.tab2): self.extended_tab,
+                     str(self.tab3): self.massive_tab, str(self.tab4): self.preview_tab}
+        self.dirty_tabs = set()
+        self.font.subscribe(self.on_font_changed)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_current_tab())
+
         # Cargar archivo si se pasó por línea de comandos
         if memfile:
             self.load_mem(memfile)
@@ -90,6 +100,20 @@ class FontEditor:
         from editor_tab_preview_dual import PreviewDualTab
         self.preview_tab = PreviewDualTab(self)
 
+    def on_font_changed(self, chars, source):
+        for tab in self.tabs.values():
+            if tab is source:
+                continue
+            if chars is None or not chars.isdisjoint(tab.visible_chars()):
+                self.dirty_tabs.add(tab)
+        self.refresh_current_tab()
+
+    def refresh_current_tab(self):
+        tab = self.tabs.get(self.notebook.select())
+        if tab in self.dirty_tabs:
+            self.dirty_tabs.discard(tab)
+            tab.refresh()
+
     def load_mem(self, path=None):
         if not path:
             path = filedialog.askopenfilename(filetypes=[("Mem files", "*.mem")])
@@ -107,36 +131,14 @@ class FontEditor:
             lines += ['00'] * (2048 - len(lines))
 
             chars_cargados = len(raw_lines) // FONT_HEIGHT
-            errores = 0
-
-            for i in range(NUM_CHARS):
-                for j in range(FONT_HEIGHT):
-                    try:
-                        self.char_data[i][j] = int(lines[i * FONT_HEIGHT + j], 16)
-                    except ValueError:
-                        self.char_data[i][j] = 0
-                        errores += 1
+            values, errores = parse_mem_lines(lines)
+            self.font.load(values)
 
             messagebox.showinfo("Carga completada", f"Se cargaron {chars_cargados} caracteres.\n"
                                                     f"{errores} líneas inválidas ignoradas." if errores else 
                                                     f"Se cargaron {chars_cargados} caracteres correctamente.")
         except Exception as e:
             messagebox.showerror("Error al cargar", str(e))
-            
-        self.notebook.select(self.tab1)
-        self.classic_tab.refresh()
-
-        self.notebook.select(self.tab2)
-        self.extended_tab.refresh()
-
-        self.notebook.select(self.tab3)
-        self.massive_tab.refresh()
-
-        self.notebook.select(self.tab4)
-        self.preview_tab.refresh()
-
-        # Y finalmente volver a la pestaña inicial (por ejemplo, Classic)
-        self.notebook.select(self.tab1)
 
     def save_mem(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".mem", filetypes=[("Mem files", "*.mem")])
@@ -144,45 +146,20 @@ class FontEditor:
             return
         try:
             with open(file_path, 'w') as f:
-                for i in range(NUM_CHARS):
-                    for j in range(FONT_HEIGHT):
-                        f.write(f"{self.char_data[i][j]:02X}\n")
+                f.write(format_mem(self.char_data))
                 messagebox.showinfo("Guardado", "Archivo guardado correctamente.")
         except Exception as e:
             messagebox.showerror("Error al guardar", str(e))
 
-    def reverse_bits(self,byte):
-        return int('{:08b}'.format(byte)[::-1], 2)
-
     def invert_all_bits(self):
-        for i in range(256):
-            for j in range(8):
-                self.char_data[i][j] = self.reverse_bits(self.char_data[i][j])
-        self.classic_tab.refresh()
-        self.extended_tab.refresh()
-        self.massive_tab.refresh()
-        self.preview_tab.refresh()
+        self.font.mirror()
 
     def export_as_png(self):
         path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
         if not path:
             return
-        tile_w, tile_h = 8, 8
-        tiles_per_row = 16
-        img_w = tile_w * tiles_per_row
-        img_h = tile_h * tiles_per_row
-        img = Image.new("1", (img_w, img_h), color=1)
-        for char_idx in range(256):
-            cx = (char_idx % tiles_per_row) * tile_w
-            cy = (char_idx // tiles_per_row) * tile_h
-            
-            for row in range(8):
-                byte = self.char_data[char_idx][row]
-                byte = self.reverse_bits(byte)  # invierte los bits horizontalmente
-
-                for col in range(8):
-                    if (byte >> (col)) & 1:
-                        img.putpixel((cx + (col), cy + row), 0)
+        # 16x16 caracteres de 8x8; bit a 1 = píxel negro sobre fondo blanco
+        img = Image.fromarray(glyph_sheet(self.char_data) == 0)
         img.save(path)
 
 # --- Ejecución desde línea de comandos ---
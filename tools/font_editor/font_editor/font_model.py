@@ -0,0 +1,76 @@
+# font_model.py
+# Datos de la fuente 8x8 (256 caracteres) con avisos de cambio para las pestañas
+
+import numpy as np
+
+NUM_CHARS = 256
+FONT_HEIGHT = 8
+
+# Byte -> byte con los 8 bits en orden inverso (espejo horizontal de una fila)
+MIRROR_LUT = np.packbits(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1),
+                         axis=1, bitorder="little").ravel()
+
+def glyph_sheet(char_data, first=0, count=NUM_CHARS, cols=16):
+    """Bitmap (alto, ancho) de 0/1 con los caracteres first..first+count en filas de cols."""
+    glyphs = np.unpackbits(np.asarray(char_data, dtype=np.uint8)[first:first + count], axis=1)
+    glyphs = glyphs.reshape(count // cols, cols, 8, 8)   # fila, columna, y, x
+    return glyphs.transpose(0, 2, 1, 3).reshape(count // cols * 8, cols * 8)
+
+def parse_mem_lines(lines):
+    """Bytes de un .mem (una línea hexadecimal por fila). Devuelve (array, líneas inválidas a 0)."""
+    # fromhex ignora los espacios: una línea vacía desaparecería y desplazaría las siguientes
+    try:
+        values = np.frombuffer(bytes.fromhex(" ".join(lines)), dtype=np.uint8)
+        if len(values) == len(lines):
+            return values, 0
+    except ValueError:
+        pass
+    # Hay líneas vacías, de un dígito o no hexadecimales: conversión línea a línea
+    values = np.zeros(len(lines), dtype=np.uint8)
+    errores = 0
+    for i, line in enumerate(lines):
+        try:
+            values[i] = int(line, 16)
+        except ValueError:
+            errores += 1
+    return values, errores
+
+def format_mem(char_data):
+    hex_text = np.asarray(char_data, dtype=np.uint8).tobytes().hex().upper()
+    return "".join(hex_text[i:i + 2] + "\n" for i in range(0, len(hex_text), 2))
+
+class FontModel:
+    def __init__(self):
+        # Las pestañas leen char_data directamente; nunca se reasigna, solo se modifica
+        self.char_data = np.zeros((NUM_CHARS, FONT_HEIGHT), dtype=np.uint8)
+        self.listeners = []
+
+    def subscribe(self, callback):
+        """callback(chars, source): chars es el conjunto de caracteres cambiados, o None si cambia toda la fuente.
+        source es quien hizo el cambio (p.ej. la pestaña que ya se ha repintado)."""
+        self.listeners.append(callback)
+
+    def notify(self, chars=None, source=None):
+        if chars is not None:
+            chars = set(chars)
+        for callback in self.listeners:
+            callback(chars, source)
+
+    def toggle_bit(self, char_index, row, col, source=None):
+        self.char_data[char_index, row] ^= 1 << (7 - col)
+        self.notify({char_index}, source)
+
+    def set_char(self, char_index, rows, source=None):
+        self.char_data[char_index] = rows
+        self.notify({char_index}, source)
+
+    def load(self, values, source=None):
+        """Carga bytes fila a fila desde el carácter 0; el resto de la fuente queda a 0."""
+        flat = self.char_data.reshape(-1)
+        flat[:] = 0
+        flat[:len(values)] = values[:flat.size]
+        self.notify(None, source)
+
+    def mirror(self, source=None):
+        self.char_data[:] = MIRROR_LUT[self.char_data]
+        self.notify(None, source)
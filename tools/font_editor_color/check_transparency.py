@@ -1,3 +1,5 @@
+import sys
+
 from PIL import Image
 import numpy as np
 
@@ -44,5 +46,12 @@ def analizar_png(path):
     else:
         print("❌ No tiene canal alfa ni paleta indexada con transparencia detectada")
 
+def main():
+    rutas = sys.argv[1:] or ["Analogizer_graffitti128_64_01.png"]
+    for ruta in rutas:
+        analizar_png(ruta)
+
 # --- USO ---
-analizar_png("Analogizer_graffitti128_64_01.png")
+# python check_transparency.py [imagen.png ...]
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,220 @@
+import argparse
+import csv
+import json
+import re
 import sys
+from fractions import Fraction
+from math import gcd
 
-best_n = 0
-best_m = 0
-best_d = 999999999
+_np = False
 
-REF_CLK = float(sys.argv[1])
-TARGET_CLK = float(sys.argv[2]) # 34.28714 / 4
+# Limits of the N/M counters
+N_MAX = 1022
+M_MAX = 1022
 
-for n in range(1,1023):
-    for m in range(1,1023):
-        clk = REF_CLK * n / m
-        d = abs(TARGET_CLK - clk)
-        if d < best_d:
-            best_n = n
-            best_m = m
-            best_d = d
 
-print(f"n={best_n}, m={best_m}, freq={REF_CLK * best_n / best_m}")
+def ppm_error(ref_clk, target_clk, n, m):
+    return (ref_clk * n / m - target_clk) / target_clk * 1e6
 
+
+def best_ratio(ref_clk, target_clk, n_max=N_MAX, m_max=M_MAX):
+    """Best n/m ~= target/ref with 1 <= n <= n_max and 1 <= m <= m_max.
+
+    Walks the continued fraction expansion of target/ref and, once a
+    convergent leaves the counter limits, checks the best semiconvergent.
+    """
+    x = Fraction(target_clk) / Fraction(ref_clk)
+    if x >= n_max:
+        return n_max, 1
+    if x * m_max <= 1:
+        return 1, m_max
+
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    r = x
+    while True:
+        a = r.numerator // r.denominator
+        p2, q2 = a * p1 + p0, a * q1 + q0
+        if p2 > n_max or q2 > m_max:
+            # Largest semiconvergent that still fits the limits
+            t = (n_max - p0) // p1
+            if q1:
+                t = min(t, (m_max - q0) // q1)
+            candidates = [(p1, q1)]
+            if t > 0:
+                candidates.append((p0 + t * p1, q0 + t * q1))
+            candidates = [(n, m) for n, m in candidates if n >= 1 and m >= 1]
+            return min(candidates, key=lambda c: (abs(Fraction(c[0], c[1]) - x), c))
+        p0, q0, p1, q1 = p1, q1, p2, q2
+        frac = r - a
+        if frac == 0:
+            return p1, q1
+        r = 1 / frac
+
+
+def _numpy():
+    # numpy is only needed for k > 1 and batches; import it on first use
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _np = numpy
+    return _np
+
+
+def _top_k_numpy(ref_clks, target_clks, k, n_max, m_max):
+    """Vectorized top-k over a whole table: one row per (ref, target) pair."""
+    np = _numpy()
+    ref = np.asarray(ref_clks, dtype=np.float64)[:, None]
+    target = np.asarray(target_clks, dtype=np.float64)[:, None]
+    m = np.arange(1, m_max + 1, dtype=np.int64)[None, :]
+    n_lo = np.floor(target * m / ref).astype(np.int64)
+    n_hi = np.clip(n_lo + 1, 1, n_max)
+    n_lo = np.clip(n_lo, 1, n_max)
+    n = np.concatenate([n_lo, n_hi], axis=1)
+    m = np.broadcast_to(np.concatenate([m, m], axis=1), n.shape)
+    err = np.abs(ref * n / m - target)
+    # Drop reducible ratios and the duplicates left by clipping
+    dup = np.concatenate([np.zeros_like(n_lo, dtype=bool), n_hi == n_lo], axis=1)
+    err[(np.gcd(n, m) != 1) | dup] = np.inf
+    order = np.lexsort((m, n, err), axis=-1)[:, :k]
+    n = np.take_along_axis(n, order, axis=1)
+    m = np.take_along_axis(m, order, axis=1)
+    return [list(zip(rn.tolist(), rm.tolist())) for rn, rm in zip(n, m)]
+
+
+def _top_k_python(ref_clk, target_clk, k, n_max, m_max):
+    pairs = set()
+    for m in range(1, m_max + 1):
+        n_lo = int(target_clk * m // ref_clk)
+        for n in (n_lo, n_lo + 1):
+            n = min(max(n, 1), n_max)
+            if gcd(n, m) == 1:
+                pairs.add((n, m))
+    pairs = sorted(pairs, key=lambda c: (abs(ref_clk * c[0] / c[1] - target_clk), c))
+    return pairs[:k]
+
+
+def solve(ref_clk, target_clk, k=1, n_max=N_MAX, m_max=M_MAX):
+    """Return the k best (n, m, freq, ppm) tuples sorted by |ppm| error."""
+    if k == 1:
+        pairs = [best_ratio(ref_clk, target_clk, n_max, m_max)]
+    elif _numpy() is not None:
+        pairs = _top_k_numpy([ref_clk], [target_clk], k, n_max, m_max)[0]
+    else:
+        pairs = _top_k_python(ref_clk, target_clk, k, n_max, m_max)
+    return [(n, m, ref_clk * n / m, ppm_error(ref_clk, target_clk, n, m)) for n, m in pairs]
+
+
+def _solve_args(args):
+    return solve(*args)
+
+
+def solve_batch(clk_pairs, k=1, n_max=N_MAX, m_max=M_MAX):
+    """Solve a list of (ref, target) pairs; returns one solve() result per pair."""
+    clk_pairs = list(clk_pairs)
+    if not clk_pairs:
+        return []
+    if _numpy() is None:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor() as pool:
+            return list(pool.map(_solve_args, [(r, t, k, n_max, m_max) for r, t in clk_pairs], chunksize=16))
+
+    refs, targets = zip(*clk_pairs)
+    results = []
+    for (ref_clk, target_clk), pairs in zip(clk_pairs, _top_k_numpy(refs, targets, k, n_max, m_max)):
+        results.append([(n, m, ref_clk * n / m, ppm_error(ref_clk, target_clk, n, m)) for n, m in pairs])
+    return results
+
+
+def parse_clk(text):
+    # Accepts plain numbers and divided clocks such as "34.28714 / 4"
+    parts = text.split('/')
+    value = float(parts[0])
+    for div in parts[1:]:
+        value /= float(div)
+    if not 0 < value < float('inf'):
+        raise argparse.ArgumentTypeError(f"el reloj debe ser positivo: {text}")
+    return value
+
+
+def load_batch(path):
+    """Read (name, ref, target) rows from a CSV or whitespace separated list.
+
+    Columns are ref, target and an optional name. Blank lines, '#' comments
+    and a non numeric header row are skipped.
+    """
+    rows = []
+    with open(path, 'r', newline='') as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            if ',' in line:
+                fields = next(csv.reader([line]))
+            else:
+                # "34.28714 / 4" is one field: join the divisor before splitting on whitespace
+                fields = re.sub(r'\s*/\s*', '/', line).split(None, 2)
+            fields = [field.strip() for field in fields]
+            try:
+                ref_clk, target_clk = parse_clk(fields[0]), parse_clk(fields[1])
+            except argparse.ArgumentTypeError as e:
+                raise ValueError(f"Linea invalida en {path}: {line} ({e})") from None
+            except (ValueError, IndexError, ZeroDivisionError):
+                if rows:
+                    raise ValueError(f"Linea invalida en {path}: {line}")
+                continue  # cabecera
+            name = fields[2] if len(fields) > 2 else fields[1]
+            rows.append((name, ref_clk, target_clk))
+    return rows
+
+
+def write_batch(rows, results, out, fmt):
+    if fmt == "json":
+        data = [{"name": name, "ref": ref_clk, "target": target_clk,
+                 "candidates": [{"n": n, "m": m, "freq": freq, "ppm": ppm} for n, m, freq, ppm in result]}
+                for (name, ref_clk, target_clk), result in zip(rows, results)]
+        json.dump(data, out, indent=4)
+        out.write("\n")
+    else:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["name", "ref", "target", "rank", "n", "m", "freq", "ppm"])
+        for (name, ref_clk, target_clk), result in zip(rows, results):
+            for rank, (n, m, freq, ppm) in enumerate(result):
+                writer.writerow([name, ref_clk, target_clk, rank, n, m, f"{freq:.9f}", f"{ppm:+.6f}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca N/M tal que REF * N / M ~= TARGET")
+    parser.add_argument("ref_clk", type=parse_clk, nargs="?")
+    parser.add_argument("target_clk", type=parse_clk, nargs="?")  # 34.28714 / 4
+    parser.add_argument("-k", "--top", type=int, default=1, help="numero de candidatos a mostrar")
+    parser.add_argument("-b", "--batch", help="CSV/lista con filas ref,target[,nombre]")
+    parser.add_argument("-o", "--output", help="fichero de salida del modo batch (.csv o .json)")
+    parser.add_argument("-f", "--format", choices=["csv", "json"], help="formato de salida del modo batch")
+    args = parser.parse_args()
+
+    if args.batch:
+        try:
+            rows = load_batch(args.batch)
+        except ValueError as e:
+            parser.error(str(e))
+        results = solve_batch([(ref_clk, target_clk) for _, ref_clk, target_clk in rows], args.top)
+        fmt = args.format or ("json" if args.output and args.output.lower().endswith(".json") else "csv")
+        if args.output:
+            with open(args.output, 'w', newline='') as out:
+                write_batch(rows, results, out, fmt)
+        else:
+            write_batch(rows, results, sys.stdout, fmt)
+        return
+
+    if args.ref_clk is None or args.target_clk is None:
+        parser.error("se necesitan REF y TARGET, o --batch")
+
+    for n, m, freq, ppm in solve(args.ref_clk, args.target_clk, args.top):
+        print(f"n={n}, m={m}, freq={freq}, ppm={ppm:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
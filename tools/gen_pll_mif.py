@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import json
+import os
+
+from parse_mif import generate_verilog_array, pair_instructions
+from pll_calc import NUM_C_COUNTERS, VCO_MAX, VCO_MIN, counter_word, solve_pll
+
+MIF_DEPTH = 512
+MIF_WIDTH = 32
+DEFAULT_CHARGE_PUMP = 2
+DEFAULT_BANDWIDTH = 3
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pll_cache")
+
+
+def build_words(m, n, c_counts, charge_pump=DEFAULT_CHARGE_PUMP, bandwidth=DEFAULT_BANDWIDTH):
+    """Reconfiguration stream as (word, comment) pairs, same order as the Quartus MIFs.
+
+    Unused C counters are written in bypass mode so that all 18 outputs
+    are always programmed.
+    """
+    if len(c_counts) > NUM_C_COUNTERS:
+        raise ValueError(f"Maximo {NUM_C_COUNTERS} contadores C")
+    c_counts = list(c_counts) + [1] * (NUM_C_COUNTERS - len(c_counts))
+
+    words = [(0x3E, "START OF MIF"),
+             (0x04, "M COUNTER"), (counter_word(m), None),
+             (0x03, "N COUNTER"), (counter_word(n), None)]
+    for idx, c in enumerate(c_counts):
+        words += [(0x05, f"C{idx} COUNTER"), (counter_word(c, idx), None)]
+    words += [(0x09, "CHARGE PUMP"), (charge_pump, None),
+              (0x08, "BANDWIDTH SETTING"), (bandwidth, None),
+              (0x3F, "END OF MIF")]
+    return words
+
+
+def format_mif(words, depth=MIF_DEPTH, width=MIF_WIDTH):
+    lines = [f"DEPTH = {depth};", f"WIDTH = {width};", "ADDRESS_RADIX = UNS;", "DATA_RADIX = BIN;",
+             "CONTENT", "BEGIN"]
+    words = list(words) + [(0, None)] * (depth - len(words))
+    for addr, (word, comment) in enumerate(words):
+        line = f"{addr} : {word:0{width}b};"
+        if comment:
+            line += f"        -- {comment}"
+        lines.append(line)
+    lines.append("END;")
+    return "\n".join(lines) + "\n"
+
+
+def format_verilog(words, name, depth=MIF_DEPTH, width=MIF_WIDTH):
+    # Same padding as a Quartus MIF run through parse_mif.py
+    bins = [f"{word:0{width}b}" for word, _ in words]
+    bins += ["0" * width] * (depth - len(bins))
+    return generate_verilog_array(pair_instructions(bins), name)
+
+
+def cache_key(request):
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+def generate(request, cache_dir=CACHE_DIR):
+    """Return {m, n, c, mif, verilog} for a request, using the on-disk cache.
+
+    request holds either explicit "m", "n" and "c" counters or "ref" and
+    "clocks" (plus optional "vco_min"/"vco_max") to be solved with
+    pll_calc.solve_pll.
+    """
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, cache_key(request) + ".json")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+
+    if "m" in request:
+        m, n, c_counts = request["m"], request["n"], request["c"]
+    else:
+        solutions = solve_pll(request["ref"], request["clocks"],
+                              request.get("vco_min", VCO_MIN), request.get("vco_max", VCO_MAX))
+        if not solutions:
+            raise ValueError("No hay solucion dentro del rango del VCO")
+        m, n, c_counts = solutions[0]["m"], solutions[0]["n"], solutions[0]["c"]
+
+    words = build_words(m, n, c_counts, request.get("charge_pump", DEFAULT_CHARGE_PUMP),
+                        request.get("bandwidth", DEFAULT_BANDWIDTH))
+    result = {
+        "m": m,
+        "n": n,
+        "c": list(c_counts),
+        "mif": format_mif(words),
+        "verilog": format_verilog(words, request["name"]),
+    }
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el MIF de reconfiguracion del PLL y el array SystemVerilog")
+    parser.add_argument("name", help="nombre del array (p.ej. 60hz)")
+    parser.add_argument("--ref", type=float, default=74.25, help="reloj de referencia en MHz")
+    parser.add_argument("--clocks", type=float, nargs="+", help="salidas requeridas en MHz (se resuelven M/N/C)")
+    parser.add_argument("--vco-min", type=float, default=VCO_MIN)
+    parser.add_argument("--vco-max", type=float, default=VCO_MAX)
+    parser.add_argument("--m", type=int)
+    parser.add_argument("--n", type=int)
+    parser.add_argument("--c", type=int, nargs="+", help="divisores C0..C17")
+    parser.add_argument("--charge-pump", type=int, default=DEFAULT_CHARGE_PUMP)
+    parser.add_argument("--bandwidth", type=int, default=DEFAULT_BANDWIDTH)
+    parser.add_argument("--mif", help="fichero .mif de salida")
+    parser.add_argument("--sv", help="fichero .v de salida con el array")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    request = {"name": args.name, "charge_pump": args.charge_pump, "bandwidth": args.bandwidth}
+    if args.m is not None and args.n is not None and args.c:
+        request.update(m=args.m, n=args.n, c=args.c)
+    elif args.clocks:
+        request.update(ref=args.ref, clocks=args.clocks, vco_min=args.vco_min, vco_max=args.vco_max)
+    else:
+        parser.error("se necesita --clocks o --m/--n/--c")
+
+    result = generate(request, None if args.no_cache else CACHE_DIR)
+    if args.mif:
+        with open(args.mif, 'w', newline='\n') as f:
+            f.write(result["mif"])
+    if args.sv:
+        with open(args.sv, 'w', newline='\n') as f:
+            f.write(result["verilog"] + "\n")
+    if not args.mif and not args.sv:
+        print(result["verilog"])
+
+
+if __name__ == "__main__":
+    main()
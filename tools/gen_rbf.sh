@@ -0,0 +1,2 @@
+#!/bin/sh
+python3 "$(dirname "$0")/reverse_bits.py" xaindSleena_pocket.rbf xain.rbf_r
@@ -0,0 +1,456 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_hex_bytes(text):
+    # Inline <part> data such as "00 01 00 00"
+    return bytes.fromhex("".join(text.split()))
+
+
+def _parse_part(elem):
+    part = {
+        "name": elem.get("name"),
+        "crc": elem.get("crc").lower() if elem.get("crc") else None,
+        "zip": elem.get("zip"),
+        "map": elem.get("map"),
+    }
+    for attr in ("length", "offset", "repeat"):
+        if elem.get(attr):
+            part[attr] = int(elem.get(attr), 0)
+    if part["name"] is None and part["crc"] is None:
+        part["data"] = parse_hex_bytes(elem.text or "")
+    return part
+
+
+def parse_mra(filename):
+    """Read the first <rom> of an MRA.
+
+    Returns a dict with the game metadata and the ordered list of rom
+    entries: parts (inline "data" or "name"/"crc" references) and
+    interleave groups {"interleave": output_bits, "parts": [...]}.
+    """
+    root = ET.parse(filename).getroot()
+    rom = root.find("rom")
+    if rom is None:
+        raise ValueError(f"{filename}: no hay elemento <rom>")
+
+    entries = []
+    for elem in rom:
+        if elem.tag == "part":
+            entries.append(_parse_part(elem))
+        elif elem.tag == "interleave":
+            entries.append({
+                "interleave": int(elem.get("output", "8")),
+                "parts": [_parse_part(p) for p in elem.findall("part")],
+            })
+    return {
+        "name": root.findtext("name", "").strip(),
+        "setname": root.findtext("setname", "").strip(),
+        "index": int(rom.get("index", "0")),
+        "md5": rom.get("md5"),
+        "zips": [z for z in rom.get("zip", "").split("|") if z],
+        "entries": entries,
+    }
+
+
+def iter_parts(mra):
+    """Every file reference of the rom, interleaved parts included."""
+    for entry in mra["entries"]:
+        for part in entry.get("parts", [entry]):
+            if "data" not in part:
+                yield part
+
+
+def open_zips(mra, rom_dirs, shared=None):
+    """ZipFiles for the zips named by the MRA, searched in rom_dirs in order.
+
+    Pass the same shared dict for several MRAs to open each zip file once;
+    the returned dict only holds the zips of this MRA.
+    """
+    if shared is None:
+        shared = {}
+    zips = {}
+    for name in mra["zips"] + [p["zip"] for p in iter_parts(mra) if p.get("zip")]:
+        for rom_dir in rom_dirs:
+            path = os.path.abspath(os.path.join(rom_dir, name))
+            if name not in zips and os.path.isfile(path):
+                if path not in shared:
+                    shared[path] = zipfile.ZipFile(path)
+                zips[name] = shared[path]
+    return zips
+
+
+def find_member(part, zips, index=None, strict=False):
+    """(ZipFile, ZipInfo) holding a part, matched by CRC first and then by name.
+
+    If the MRA zips do not have the CRC, a rom_index.RomIndex can resolve
+    it anywhere in the library (parent or clone zips with other names).
+    A member that only matches by name has different data than the MRA
+    expects: it is used with a warning, or rejected when strict is set.
+    """
+    candidates = [zips[part["zip"]]] if part.get("zip") in zips else list(zips.values())
+    by_name = None
+    for zf in candidates:
+        for info in zf.infolist():
+            if part["name"] and info.filename.lower() == part["name"].lower():
+                if not part["crc"] or info.CRC == int(part["crc"], 16):
+                    return zf, info
+                by_name = by_name or (zf, info)
+    if part["crc"]:
+        crc = int(part["crc"], 16)
+        for zf in candidates:
+            for info in zf.infolist():
+                if info.CRC == crc and not info.is_dir():
+                    return zf, info
+        if index is not None:
+            member = index.find_member(crc)
+            if member is not None:
+                return member
+    if by_name is not None:
+        zf, info = by_name
+        message = (f"{part['name']} en {os.path.basename(zf.filename)} tiene crc {info.CRC:08x}, "
+                   f"el MRA espera {part['crc']}")
+        if strict:
+            raise ValueError(message)
+        print(f"[AVISO] {message}", file=sys.stderr)
+        return by_name
+    raise FileNotFoundError(f"No se encuentra {part['name']} (crc {part['crc']}) en {', '.join(zips) or 'ningun zip'}")
+
+
+def part_size(part, member):
+    if "data" in part:
+        return len(part["data"])
+    size = part.get("length", member[1].file_size - part.get("offset", 0))
+    return size * part.get("repeat", 1)
+
+
+def map_layout(part, word_bytes):
+    """[(output byte, input byte)] pairs and input word width for an interleave map."""
+    mapping = part["map"] or "".join(str(i) for i in range(word_bytes, 0, -1))
+    if len(mapping) != word_bytes:
+        raise ValueError(f"map='{mapping}' no encaja con output={word_bytes * 8}")
+    pairs = [(word_bytes - 1 - pos, int(d) - 1) for pos, d in enumerate(mapping) if d != "0"]
+    return pairs, max(src for _, src in pairs) + 1
+
+
+def rom_layout(mra, zips, index=None, strict=False):
+    """Resolve every rom entry to (entry, offset, size, members) without reading data."""
+    layout = []
+    offset = 0
+    for entry in mra["entries"]:
+        if "interleave" in entry:
+            word_bytes = entry["interleave"] // 8
+            members = [None if "data" in p else find_member(p, zips, index, strict) for p in entry["parts"]]
+            words = {part_size(p, m) // map_layout(p, word_bytes)[1] for p, m in zip(entry["parts"], members)}
+            if len(words) != 1:
+                raise ValueError("Partes de distinto tamaño en un <interleave>")
+            size = words.pop() * word_bytes
+        else:
+            members = [None if "data" in entry else find_member(entry, zips, index, strict)]
+            size = part_size(entry, members[0])
+        layout.append((entry, offset, size, members))
+        offset += size
+    return layout
+
+
+def read_part(part, member, view):
+    """Fill view with the part data (inline bytes or zip member, with offset/length/repeat).
+
+    member is a (ZipFile, ZipInfo) pair or the already decompressed bytes.
+    """
+    if "data" in part:
+        view[:] = part["data"]
+        return
+    repeat = part.get("repeat", 1)
+    size = len(view) // repeat
+    if isinstance(member, (bytes, bytearray)):
+        offset = part.get("offset", 0)
+        if len(member) < offset + size:
+            raise ValueError(f"{part['name']}: datos insuficientes")
+        view[:size] = memoryview(member)[offset:offset + size]
+    else:
+        zf, info = member
+        read_member(zf, info, part.get("offset", 0), view[:size])
+    for i in range(1, repeat):
+        view[i * size:(i + 1) * size] = view[:size]
+
+
+def read_member(zf, info, offset, view):
+    with zf.open(info) as f:
+        if offset:
+            f.seek(offset)
+        done = 0
+        while done < len(view):
+            n = f.readinto(view[done:])
+            if not n:
+                raise ValueError(f"{info.filename}: datos insuficientes")
+            done += n
+
+
+def fill_entry(entry, size, members, view):
+    if "interleave" not in entry:
+        read_part(entry, members[0], view)
+        return
+    word_bytes = entry["interleave"] // 8
+    for part, member in zip(entry["parts"], members):
+        pairs, in_width = map_layout(part, word_bytes)
+        data = bytearray(size // word_bytes * in_width)
+        read_part(part, member, memoryview(data))
+        src = memoryview(data)
+        for dst_byte, src_byte in pairs:
+            view[dst_byte::word_bytes] = src[src_byte::in_width]
+
+
+def build_rom(layout):
+    rom = bytearray(sum(size for _, _, size, _ in layout))
+    view = memoryview(rom)
+    for entry, offset, size, members in layout:
+        fill_entry(entry, size, members, view[offset:offset + size])
+    return rom
+
+
+def assemble_rom(mra, rom_dirs, index=None, strict=False):
+    """Build the rom image of an MRA into a single preallocated bytearray."""
+    zips = open_zips(mra, rom_dirs)
+    try:
+        return build_rom(rom_layout(mra, zips, index, strict))
+    finally:
+        for zf in zips.values():
+            zf.close()
+
+
+def _load_member(member):
+    zf, info = member
+    data = bytearray(info.file_size)
+    read_member(zf, info, 0, memoryview(data))
+    return data
+
+
+def assemble_many(mras, rom_dirs, workers=None, index=None, strict=False):
+    """Build several MRAs sharing zips and decompressed parts.
+
+    Every zip is opened once and every member used by any of the MRAs is
+    decompressed once, in a thread pool (zlib releases the GIL). Returns
+    the rom images in the same order as mras.
+    """
+    zips = {}
+    try:
+        layouts = [rom_layout(mra, open_zips(mra, rom_dirs, zips), index, strict) for mra in mras]
+        needed = {}
+        for layout in layouts:
+            for _, _, _, members in layout:
+                for member in members:
+                    if member is not None:
+                        needed.setdefault((member[0].filename, member[1].filename), member)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = dict(zip(needed, pool.map(_load_member, needed.values())))
+
+        roms = []
+        for layout in layouts:
+            layout = [(entry, offset, size,
+                       [None if m is None else loaded[(m[0].filename, m[1].filename)] for m in members])
+                      for entry, offset, size, members in layout]
+            roms.append(build_rom(layout))
+        return roms
+    finally:
+        for zf in zips.values():
+            zf.close()
+
+
+def region_groups(layout):
+    """Split a layout into regions: each inline data entry (board ID, region
+    header) starts a new region that runs until the next one."""
+    regions = []
+    for item in layout:
+        if not regions or "data" in item[0]:
+            regions.append([])
+        regions[-1].append(item)
+    return regions
+
+
+def _part_signature(part, member):
+    if "data" in part:
+        return {"data": part["data"].hex()}
+    zf, info = member
+    sig = {"name": part["name"], "crc": f"{info.CRC:08x}", "zip": os.path.basename(zf.filename),
+           "member": info.filename}
+    for attr in ("map", "offset", "length", "repeat"):
+        if part.get(attr) is not None:
+            sig[attr] = part[attr]
+    return sig
+
+
+def region_manifest(layout):
+    """Per-region header, offset, size and input parts, from the zip directories only."""
+    manifest = []
+    for group in region_groups(layout):
+        first = group[0][0]
+        parts = []
+        for entry, _, _, members in group:
+            for part, member in zip(entry.get("parts", [entry]), members):
+                parts.append(_part_signature(part, member))
+        manifest.append({
+            "header": first["data"].hex() if "data" in first else None,
+            "offset": group[0][1],
+            "size": sum(size for _, _, size, _ in group),
+            "parts": parts,
+        })
+    return manifest
+
+
+def manifest_path(rom_file):
+    return rom_file + ".manifest.json"
+
+
+def output_stamp(path):
+    """Size, mtime and md5 of a .rom, to tell whether it is still the file a manifest describes."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "md5": file_md5(path)}
+
+
+def rebuild_rom(mra, rom_dirs, output, index=None, strict=False):
+    """Build output, patching in place only the regions whose inputs changed.
+
+    The region manifest written next to the .rom records each region's
+    header, parts and member CRCs, and the size, mtime and md5 of the
+    .rom it was written for. If the .rom is still that file and the
+    layout still matches, it is memory-mapped and only the changed
+    regions are refilled; otherwise the whole image is rebuilt. Returns the
+    (rebuilt, total) region counts.
+    """
+    zips = open_zips(mra, rom_dirs)
+    try:
+        layout = rom_layout(mra, zips, index, strict)
+        manifest = region_manifest(layout)
+        total = sum(region["size"] for region in manifest)
+        try:
+            with open(manifest_path(output), 'r') as f:
+                saved = json.load(f)
+            old, stamp = saved["regions"], saved["output"]
+            # A full build or an edit since the manifest was written leaves it stale
+            if stamp["size"] != total or output_stamp(output) != stamp:
+                old = None
+        except (OSError, ValueError, KeyError, TypeError):
+            old = None
+        same_shape = (old is not None
+                      and [(r["offset"], r["size"]) for r in old] == [(r["offset"], r["size"]) for r in manifest])
+
+        if not same_shape:
+            rom = build_rom(layout)
+            with open(output, 'wb') as f:
+                f.write(rom)
+            rebuilt = len(manifest)
+        else:
+            rebuilt = 0
+            with open(output, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+                view = memoryview(mm)
+                try:
+                    for group, region, prev in zip(region_groups(layout), manifest, old):
+                        if region == prev:
+                            continue
+                        for entry, offset, size, members in group:
+                            fill_entry(entry, size, members, view[offset:offset + size])
+                        rebuilt += 1
+                    mm.flush()
+                finally:
+                    view.release()
+
+        with open(manifest_path(output), 'w') as f:
+            json.dump({"mra": mra["name"], "setname": mra["setname"], "size": total,
+                       "output": output_stamp(output), "regions": manifest}, f, indent=4)
+        return rebuilt, len(manifest)
+    finally:
+        for zf in zips.values():
+            zf.close()
+
+
+def file_md5(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+_ROM_MD5 = re.compile(r"""(<rom\b[^>]*?\bmd5=)(["'])[^"']*\2""")
+
+
+def stamp_md5(mra_file, md5):
+    """Write md5 into the <rom md5=...> attribute, keeping the rest of the file as is."""
+    with open(mra_file, 'r', newline='') as f:
+        text = f.read()
+    new_text, count = _ROM_MD5.subn(lambda mo: f"{mo.group(1)}{mo.group(2)}{md5}{mo.group(2)}", text, count=1)
+    if count and new_text != text:
+        with open(mra_file, 'w', newline='') as f:
+            f.write(new_text)
+    return bool(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el .rom de uno o varios MRA (sustituye a mra.exe)")
+    parser.add_argument("mra_files", nargs="+")
+    parser.add_argument("-r", "--roms", action="append", help="directorio con los zips (repetible)")
+    parser.add_argument("-o", "--output", help="fichero .rom de salida (solo con un MRA)")
+    parser.add_argument("-d", "--out-dir", default=".", help="directorio de salida (<setname>.rom)")
+    parser.add_argument("--stamp", action="store_true", help="escribir el md5 del .rom en el atributo md5 del MRA")
+    parser.add_argument("--index", help="indice de rom_index.py para resolver partes por CRC")
+    parser.add_argument("--incremental", action="store_true",
+                        help="regenerar solo las regiones cambiadas segun el manifiesto junto al .rom")
+    parser.add_argument("--strict", action="store_true",
+                        help="fallar si una parte solo coincide por nombre y no por crc")
+    args = parser.parse_args()
+
+    if args.output and len(args.mra_files) > 1:
+        parser.error("-o solo admite un MRA; use --out-dir")
+    mras = [parse_mra(path) for path in args.mra_files]
+    rom_dirs = args.roms or ["."]
+    index = None
+    if args.index:
+        from rom_index import RomIndex
+        index = RomIndex(args.index)
+    try:
+        if args.incremental:
+            for mra_file, mra in zip(args.mra_files, mras):
+                output = args.output or os.path.join(args.out_dir, f"{mra['setname']}.rom")
+                rebuilt, total = rebuild_rom(mra, rom_dirs, output, index, args.strict)
+                md5 = file_md5(output)
+                print(f"{output}: {rebuilt}/{total} regiones regeneradas, md5 {md5}")
+                if args.stamp:
+                    stamp_md5(mra_file, md5)
+            return
+        if len(mras) == 1:
+            roms = [assemble_rom(mras[0], rom_dirs, index, args.strict)]
+        else:
+            roms = assemble_many(mras, rom_dirs, index=index, strict=args.strict)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if index is not None:
+            index.close()
+
+    for mra_file, mra, rom in zip(args.mra_files, mras, roms):
+        output = args.output or os.path.join(args.out_dir, f"{mra['setname']}.rom")
+        with open(output, 'wb') as f:
+            f.write(rom)
+        # The region manifest of an earlier --incremental run no longer describes this file
+        try:
+            os.remove(manifest_path(output))
+        except FileNotFoundError:
+            pass
+        md5 = hashlib.md5(rom).hexdigest()
+        print(f"{output}: {len(rom)} bytes, md5 {md5}")
+        if args.stamp:
+            stamp_md5(mra_file, md5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dip_cache")
+CACHE_VERSION = 1
+
+# Where core_top.sv latches the DIP switches written by the Pocket
+DSW_ADDRESS = 0xF1000000
+DSW_PORT = "DSW"
+FIRST_ID = 100
+
+
+def parse_switches(filename):
+    """Read <switches> from an MRA.
+
+    Returns {"default": bytes, "dips": [...]} where every dip has its
+    name, lowest bit, width and the (label, MRA value) options in MRA
+    order. bits="3,2" and bits="2,3" describe the same field.
+    """
+    root = ET.parse(filename).getroot()
+    switches = root.find("switches")
+    if switches is None:
+        return {"default": b"", "dips": []}
+    base = int(switches.get("base", "10"))
+    default = bytes(int(b, 16) for b in switches.get("default", "").split(",") if b.strip())
+
+    dips = []
+    for dip in switches.findall("dip"):
+        bits = [int(b) for b in dip.get("bits").split(",")]
+        lo, hi = min(bits), max(bits)
+        labels = dip.get("ids", "").split(",")
+        if dip.get("values"):
+            values = [int(v, base) for v in dip.get("values").split(",")]
+        else:
+            values = list(range(len(labels)))
+        if len(values) != len(labels):
+            raise ValueError(f"{filename}: '{dip.get('name')}' tiene {len(labels)} ids y {len(values)} values")
+        dips.append({
+            "name": dip.get("name"),
+            "lo": lo,
+            "width": hi - lo + 1,
+            "options": [(label.strip(), value) for label, value in zip(labels, values)],
+        })
+    return {"default": default, "dips": dips}
+
+
+def field_mask(dip):
+    return ((1 << dip["width"]) - 1) << dip["lo"]
+
+
+def default_word(switches):
+    # "3F,FF" is DSW1 = 0x3F, DSW2 = 0xFF: byte 0 holds bits 0-7
+    return int.from_bytes(switches["default"], "little")
+
+
+def pocket_value(dip, mra_value):
+    """The Pocket writes the switches active-low: a 1 in the MRA is a 0 on the bus."""
+    return ~(mra_value << dip["lo"]) & field_mask(dip)
+
+
+def default_dsw(switches):
+    """Default DSW word for the Assets memory_writes, as the Pocket expects it."""
+    width = len(switches["default"]) * 8
+    return ~default_word(switches) & ((1 << width) - 1)
+
+
+def interact_variables(switches, address=DSW_ADDRESS, first_id=FIRST_ID, port=DSW_PORT):
+    """One Interact "list" variable per dip, with the default taken from <switches default>."""
+    default = default_word(switches)
+    variables = []
+    for offset, dip in enumerate(switches["dips"]):
+        mask = field_mask(dip)
+        current = (default & mask) >> dip["lo"]
+        values = [value for _, value in dip["options"]]
+        variables.append({
+            "name": dip["name"],
+            "port": port,
+            "id": first_id + offset,
+            "type": "list",
+            "enabled": True,
+            "persist": True,
+            "address": f"0x{address:08X}",
+            "defaultval": values.index(current) if current in values else 0,
+            "mask": f"0x{~mask & 0xFFFFFFFF:08X}",
+            "options": [{"name": label, "value": f"0x{pocket_value(dip, value):08X}"}
+                        for label, value in dip["options"]],
+        })
+    return variables
+
+
+def cache_key(data, address, first_id, port):
+    key = hashlib.sha256(data)
+    key.update(json.dumps([CACHE_VERSION, address, first_id, port]).encode())
+    return key.hexdigest()
+
+
+def compile_switches(mra_file, cache_dir=CACHE_DIR, address=DSW_ADDRESS, first_id=FIRST_ID, port=DSW_PORT):
+    """Return {"variables": [...], "dsw": "0x..."} for an MRA, cached on its content hash."""
+    with open(mra_file, 'rb') as f:
+        data = f.read()
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, cache_key(data, address, first_id, port) + ".json")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+
+    switches = parse_switches(mra_file)
+    result = {
+        "variables": interact_variables(switches, address, first_id, port),
+        "dsw": f"0x{default_dsw(switches):08X}",
+    }
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+    return result
+
+
+def merge_interact(preset, variables, port=DSW_PORT):
+    """Copy of an Interact preset with its DIP variables replaced by the compiled ones."""
+    interact = dict(preset["interact"])
+    interact["variables"] = [v for v in interact["variables"] if v.get("port") != port] + variables
+    return {**preset, "interact": interact}
+
+
+def format_table(switches):
+    lines = [f"default {','.join(f'{b:02X}' for b in switches['default'])}  "
+             f"-> DSW 0x{default_dsw(switches):08X}"]
+    default = default_word(switches)
+    for dip in switches["dips"]:
+        current = (default & field_mask(dip)) >> dip["lo"]
+        bits = f"{dip['lo']}" if dip["width"] == 1 else f"{dip['lo']}-{dip['lo'] + dip['width'] - 1}"
+        lines.append(f"  {dip['name']:<16} bits {bits:<6} mask 0x{field_mask(dip):04X}")
+        for label, value in dip["options"]:
+            mark = "*" if value == current else " "
+            lines.append(f"    {mark} {label:<24} mra {value:<3} pocket 0x{pocket_value(dip, value):08X}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila los <switches> de un MRA a variables Interact del Pocket")
+    parser.add_argument("mra_file")
+    parser.add_argument("--json", action="store_true", help="mostrar las variables Interact en JSON")
+    parser.add_argument("--preset", help="preset Interact existente a actualizar con los DIP compilados")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    result = compile_switches(args.mra_file, None if args.no_cache else CACHE_DIR)
+    if args.preset:
+        with open(args.preset, 'r', encoding='utf-8') as f:
+            preset = json.load(f)
+        with open(args.preset, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(merge_interact(preset, result["variables"]), indent=4, ensure_ascii=False) + "\n")
+        print(f"{args.preset}: {len(result['variables'])} DIP, DSW por defecto {result['dsw']}")
+    elif args.json:
+        print(json.dumps(result, indent=4, ensure_ascii=False))
+    else:
+        print(format_table(parse_switches(args.mra_file)))
+
+
+if __name__ == "__main__":
+    main()
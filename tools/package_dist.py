@@ -0,0 +1,239 @@
+import argparse
+import errno
+import hashlib
+import json
+import os
+import zipfile
+
+from mra_rom import parse_mra
+from mra_switches import DSW_ADDRESS, compile_switches, merge_interact
+from reverse_bits import reverse_file
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dist_manifest.json")
+STATE_FILE = ".dist_state.json"
+MAGIC = "APF_VER_1"
+
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest["_base"] = os.path.dirname(os.path.abspath(path))
+    return manifest
+
+
+def resolve(manifest, path):
+    # Paths in the manifest are relative to the manifest itself
+    return os.path.normpath(os.path.join(manifest["_base"], path))
+
+
+def dump_json(obj):
+    return (json.dumps(obj, indent=4, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def sha1_bytes(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def sha1_file(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def game_md5(game, mra):
+    md5 = game.get("md5") or mra["md5"]
+    return md5 if md5 and md5.lower() != "none" else None
+
+
+def dsw_writes(writes, dips):
+    if not dips["variables"]:
+        return writes
+    return [dict(w, data=dips["dsw"]) if int(w["address"], 16) == DSW_ADDRESS else w for w in writes]
+
+
+def render_files(manifest):
+    """Every generated file as {path relative to dist: bytes}.
+
+    core.json and data.json come from the manifest; for each game the
+    Assets instance JSON and the Input/Interact presets are derived from
+    the MRA in tools/. The DIP variables of the Interact preset and the
+    default DSW write are compiled from the MRA <switches>. The MRA
+    placed in Assets is game["dist_mra"] when given (the one shipped
+    for the Pocket, which differs in <rbf> and <rotation>), otherwise a
+    copy of the tools/ MRA.
+    """
+    core_id = manifest["core_id"]
+    platform = manifest["platform"]
+    files = {
+        f"Cores/{core_id}/core.json": dump_json({"core": manifest["core"]}),
+        f"Cores/{core_id}/data.json": dump_json({"data": {"magic": MAGIC, "data_slots": manifest["data_slots"]}}),
+    }
+    instance = manifest["instance"]
+    for game in manifest["games"]:
+        mra_file = resolve(manifest, game["mra"])
+        mra = parse_mra(mra_file)
+        stem = os.path.splitext(os.path.basename(mra_file))[0]
+        dips = compile_switches(mra_file)
+
+        slot = {"id": instance["rom_slot"], "filename": f"{mra['setname']}.rom"}
+        md5 = game_md5(game, mra)
+        if md5:
+            slot["md5"] = md5
+        files[f"Assets/{platform}/{core_id}/{stem}.json"] = dump_json({"instance": {
+            "magic": MAGIC,
+            "variant_select": instance["variant_select"],
+            "data_slots": [slot],
+            "memory_writes": dsw_writes(game.get("memory_writes", instance["memory_writes"]), dips),
+        }})
+        for kind, preset in manifest["presets"].items():
+            if kind == "Interact" and dips["variables"]:
+                preset = merge_interact(preset, dips["variables"])
+            files[f"Presets/{core_id}/{kind}/{platform}/{core_id}/{stem}.json"] = dump_json(preset)
+        dist_mra = resolve(manifest, game.get("dist_mra", game["mra"]))
+        with open(dist_mra, 'rb') as f:
+            files[f"Assets/{platform}/mra/{os.path.basename(dist_mra)}"] = f.read()
+    return files
+
+
+def write_if_changed(path, data):
+    """Write data unless the file already holds exactly these bytes (keeps its mtime)."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+class DistState:
+    """File hashes from the previous run, keyed by (size, mtime) so unchanged files are not re-read."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        self.files = self.data.setdefault("files", {})
+
+    def file_hash(self, path):
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.files.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha1"]
+        digest = sha1_file(path)
+        self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        return digest
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.data, f, indent=4)
+        os.replace(tmp, self.path)
+
+
+def place_bitstream(manifest, dist_dir, state):
+    """Bit-reverse the Quartus .rbf into the core folder when its content changed."""
+    bit = manifest["bitstream"]
+    src = resolve(manifest, bit["src"])
+    dst = os.path.join(dist_dir, "Cores", manifest["core_id"], bit["dst"])
+    src_hash = state.file_hash(src)
+    if os.path.isfile(dst) and state.data.get("bitstream") == [src_hash, state.file_hash(dst)]:
+        return False
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    reverse_file(src, dst)
+    state.data["bitstream"] = [src_hash, state.file_hash(dst)]
+    return True
+
+
+def dist_tree(dist_dir):
+    """Sorted [(archive name, path)] of every file under dist."""
+    entries = []
+    for root, dirs, files in os.walk(dist_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            entries.append((os.path.relpath(path, dist_dir).replace(os.sep, "/"), path))
+    return entries
+
+
+def build_zip(entries, output, date_time):
+    """Deterministic zip: sorted entries, fixed timestamps and permissions."""
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp = output + ".tmp"
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for arcname, path in entries:
+            info = zipfile.ZipInfo(arcname, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            info.create_system = 3
+            with open(path, 'rb') as f:
+                zf.writestr(info, f.read())
+    os.replace(tmp, output)
+
+
+def release_date(manifest):
+    # Zip timestamps come from the release date so the archive only depends on its content
+    year, month, day = (int(x) for x in manifest["core"]["metadata"]["date_release"].split("-"))
+    return (year, month, day, 0, 0, 0)
+
+
+def package(manifest, dist_dir=None, release=None, state_path=None):
+    """Regenerate dist/ and the release zip. Returns (written files, bitstream placed, zip path or None)."""
+    dist_dir = dist_dir or resolve(manifest, manifest["dist"])
+    state = DistState(state_path or os.path.join(manifest["_base"], STATE_FILE))
+    # Fail before touching dist/ rather than leave it half updated
+    bitstream = resolve(manifest, manifest["bitstream"]["src"])
+    if not os.path.isfile(bitstream):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), bitstream)
+
+    written = [rel for rel, data in sorted(render_files(manifest).items())
+               if write_if_changed(os.path.join(dist_dir, rel), data)]
+    placed = place_bitstream(manifest, dist_dir, state)
+
+    zip_path = None
+    if release is not False:
+        version = manifest["core"]["metadata"]["version"]
+        zip_path = release or resolve(manifest, manifest["release_zip"].format(version=version))
+        entries = dist_tree(dist_dir)
+        tree_hash = sha1_bytes("\n".join(f"{arc} {state.file_hash(path)}" for arc, path in entries).encode())
+        if not os.path.isfile(zip_path) or state.data.get("release", {}).get(zip_path) != tree_hash:
+            build_zip(entries, zip_path, release_date(manifest))
+            state.data.setdefault("release", {})[zip_path] = tree_hash
+        else:
+            zip_path = None
+    state.save()
+    return written, placed, zip_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera dist/ (JSON, MRA, bitstream) y el zip de release desde un manifiesto")
+    parser.add_argument("-m", "--manifest", default=DEFAULT_MANIFEST, help="manifiesto del core (por defecto dist_manifest.json)")
+    parser.add_argument("--dist", help="directorio dist de salida (por defecto el del manifiesto)")
+    parser.add_argument("-o", "--output", help="zip de release (por defecto el del manifiesto)")
+    parser.add_argument("--no-zip", action="store_true", help="no generar el zip de release")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    try:
+        written, placed, zip_path = package(manifest, args.dist, False if args.no_zip else args.output)
+    except FileNotFoundError as e:
+        parser.error(f"no existe {e.filename}")
+    for rel in written:
+        print(f"actualizado {rel}")
+    print(f"bitstream {'invertido' if placed else 'sin cambios'}")
+    if zip_path:
+        print(f"release {zip_path}")
+    elif not args.no_zip:
+        print("release sin cambios")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-import sys
+import argparse
+import re
 
 opcode_labels = {
     0x3E: "START OF MIF",
@@ -11,66 +12,186 @@ opcode_labels = {
     0x02: "START RECONFIG"
 }
 
-def clean_bin(word):
-    # Eliminar comentarios y caracteres extra
-    return word.split(';')[0].strip()
+RADIX_BASES = {"BIN": 2, "OCT": 8, "DEC": 10, "UNS": 10, "HEX": 16}
 
-def parse_mif(filename):
+_MIF_SPECIAL = re.compile(r"--|%|;")
+
+def mif_statements(f):
+    """Yield the ';' terminated statements of a MIF, without comments.
+
+    Reads line by line, so memory use does not depend on the file size.
+    Handles '-- line' and '% block %' comments.
+    """
+    buf = []
+    in_comment = False
+    for line in f:
+        pos = 0
+        while True:
+            if in_comment:
+                end = line.find('%', pos)
+                if end < 0:
+                    break
+                in_comment = False
+                pos = end + 1
+                continue
+            mo = _MIF_SPECIAL.search(line, pos)
+            if mo is None:
+                buf.append(line[pos:])
+                break
+            buf.append(line[pos:mo.start()])
+            if mo.group() == '--':
+                buf.append('\n')
+                break
+            if mo.group() == '%':
+                in_comment = True
+            else:
+                stmt = ''.join(buf).strip()
+                buf = []
+                if stmt:
+                    yield stmt
+            pos = mo.end()
+
+def parse_mif_value(text, base, width):
+    value = int(text, base)
+    if value < 0:  # DEC admite negativos en complemento a 2
+        value &= (1 << width) - 1
+    return value
+
+def iter_mif(filename, header=None):
+    """Stream (address, value) records from a Quartus MIF.
+
+    Supports the DEPTH/WIDTH/ADDRESS_RADIX/DATA_RADIX header, single
+    addresses with one or several consecutive values and '[a..b] : v...'
+    ranges (the values repeat over the range). If a dict is given as
+    header it is filled with the header fields as they are read.
+    """
+    if header is None:
+        header = {}
+    header.setdefault("WIDTH", 32)
+    header.setdefault("ADDRESS_RADIX", "UNS")
+    header.setdefault("DATA_RADIX", "UNS")
+    in_content = False
     with open(filename, 'r') as f:
-        lines = [line.strip() for line in f if ':' in line and not line.strip().startswith('--')]
+        for stmt in mif_statements(f):
+            if not in_content:
+                key, sep, value = stmt.partition('=')
+                if sep:
+                    key, value = key.strip().upper(), value.strip().upper()
+                    header[key] = int(value) if key in ("DEPTH", "WIDTH") else value
+                    continue
+                tokens = stmt.split(None, 2)
+                if [t.upper() for t in tokens[:2]] != ["CONTENT", "BEGIN"]:
+                    raise ValueError(f"Sentencia MIF inesperada: {stmt}")
+                in_content = True
+                if len(tokens) < 3:
+                    continue
+                stmt = tokens[2]
+            if stmt.upper() == "END":
+                return
 
-    instructions = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        _, data = line.split(':')
-        word = clean_bin(data)
+            addr_text, sep, data_text = stmt.partition(':')
+            if not sep:
+                raise ValueError(f"Sentencia MIF invalida: {stmt}")
+            addr_base = RADIX_BASES[header["ADDRESS_RADIX"]]
+            data_base = RADIX_BASES[header["DATA_RADIX"]]
+            width = header["WIDTH"]
+            values = [parse_mif_value(v, data_base, width) for v in data_text.split()]
+            addr_text = addr_text.strip()
+            if addr_text.startswith('['):
+                lo, hi = addr_text.strip('[]').split('..')
+                lo, hi = int(lo, addr_base), int(hi, addr_base)
+                for addr in range(lo, hi + 1):
+                    yield addr, values[(addr - lo) % len(values)]
+            else:
+                addr = int(addr_text, addr_base)
+                for offset, value in enumerate(values):
+                    yield addr + offset, value
 
+def parse_mif(filename):
+    header = {}
+    words = (f"{value:0{header['WIDTH']}b}" for _, value in iter_mif(filename, header))
+    return pair_instructions(words)
+
+def pair_instructions(words):
+    """Group binary data words into (opcode, value, label) tuples."""
+    instructions = []
+    words = iter(words)
+    for word in words:
         # Detect opcode (lowest 6 bits)
         try:
             opcode_val = int(word, 2) & 0x3F
         except ValueError:
-            i += 1
             continue
 
         label = opcode_labels.get(opcode_val, None)
 
         if opcode_val in [0x3E, 0x3F]:  # SOM / EOM
             instructions.append((word, None, label))
-            i += 1
         else:
-            if i + 1 < len(lines):
-                _, data2 = lines[i + 1].split(':')
-                value = clean_bin(data2)
-                instructions.append((word, value, label))
-                i += 2
-            else:
+            value = next(words, None)
+            if value is None:
                 break
+            instructions.append((word, value, label))
+    return instructions
+
+def trim_padding(instructions):
+    """Drop everything after END OF MIF (the zero padding up to DEPTH)."""
+    for idx, (opcode, _, _) in enumerate(instructions):
+        if int(opcode, 2) & 0x3F == 0x3F:
+            return instructions[:idx + 1]
     return instructions
 
+def register_key(opcode, value):
+    # C counters share the opcode, the counter number is in bits 22:18 of the value
+    opcode_val = int(opcode, 2) & 0x3F
+    if opcode_val == 0x05:
+        return opcode_val, (int(value, 2) >> 18) & 0x1F
+    return opcode_val, None
+
+def diff_instructions(base, target):
+    """Writes of target that differ from base, wrapped in START/END OF MIF.
+
+    Both streams are compared register by register, so the result only
+    reprograms what changes when switching from the base profile.
+    """
+    base_values = {register_key(op, val): int(val, 2) for op, val, _ in trim_padding(base) if val}
+    result = []
+    for opcode, value, label in trim_padding(target):
+        if value is None:
+            result.append((opcode, value, label))
+        elif base_values.get(register_key(opcode, value)) != int(value, 2):
+            result.append((opcode, value, label))
+    return result
+
 def generate_verilog_array(instructions, name):
+    words = sum(2 if value else 1 for _, value, _ in instructions)
     result = []
-    result.append(f"localparam int {name.upper()}_LEN = {len(instructions) * 2};")
-    result.append(f"logic [31:0] {name} [0:{len(instructions) * 2 - 1}] = '{{")
+    result.append(f"localparam int {name.upper()}_LEN = {words};")
+    result.append(f"logic [31:0] {name} [0:{words - 1}] = '{{")
     for idx, (opcode, value, label) in enumerate(instructions):
         comment = f" // {label}" if label else ""
+        sep = "," if idx < len(instructions) - 1 else ""
         if value:
-            result.append(f"  'h{int(opcode, 2):X}, 'h{int(value, 2):X},{comment}")
+            result.append(f"  'h{int(opcode, 2):X}, 'h{int(value, 2):X}{sep}{comment}")
         else:
-            result.append(f"  'h{int(opcode, 2):X},{comment}")
+            result.append(f"  'h{int(opcode, 2):X}{sep}{comment}")
     result.append("};")
     return "\n".join(result)
 
 def main():
-    if len(sys.argv) != 3:
-        print("Uso: python parse_streaming_mif_labeled.py archivo.mif nombre_array")
-        sys.exit(1)
-
-    mif_file = sys.argv[1]
-    array_name = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Convierte un MIF de reconfiguracion del PLL en un array SystemVerilog")
+    parser.add_argument("mif_file")
+    parser.add_argument("array_name")
+    parser.add_argument("--compact", action="store_true", help="omitir el relleno tras END OF MIF")
+    parser.add_argument("--diff", metavar="BASE_MIF", help="emitir solo las escrituras que cambian respecto a BASE_MIF")
+    args = parser.parse_args()
 
-    instructions = parse_mif(mif_file)
-    output = generate_verilog_array(instructions, array_name)
+    instructions = parse_mif(args.mif_file)
+    if args.diff:
+        instructions = diff_instructions(parse_mif(args.diff), instructions)
+    elif args.compact:
+        instructions = trim_padding(instructions)
+    output = generate_verilog_array(instructions, args.array_name)
     print(output)
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+import argparse
+import heapq
+from math import ceil, floor, gcd
+
+# Cyclone V fPLL limits (5CEBA4 speed grade C8)
+COUNTER_MAX = 512
+NUM_C_COUNTERS = 18
+VCO_MIN = 600.0
+VCO_MAX = 1300.0
+PFD_MIN = 5.0
+PFD_MAX = 325.0
+
+
+def encode_counter(count):
+    """Split a division factor into the (high, low, bypass, odd) fields of the PLL counters."""
+    if not 1 <= count <= COUNTER_MAX:
+        raise ValueError(f"Divisor fuera de rango: {count}")
+    if count == 1:
+        return 1, 1, 1, 0
+    high = (count + 1) // 2
+    low = count // 2
+    return high, low, 0, count & 1
+
+
+def counter_word(count, select=None):
+    """Data word for the M/N (select=None) or C<select> counter register.
+
+    Same layout as the reconfiguration MIF: low count in bits 7:0, high
+    count in 15:8, bypass in 16, odd division in 17 and, for C counters,
+    the counter number in 22:18.
+    """
+    high, low, bypass, odd = encode_counter(count)
+    word = (odd << 17) | (bypass << 16) | ((high & 0xFF) << 8) | (low & 0xFF)
+    if select is not None:
+        word |= (select & 0x1F) << 18
+    return word
+
+
+def decode_counter(word):
+    """Return (count, select) from a counter data word (inverse of counter_word)."""
+    # An 8-bit high/low field of 0 stands for 256, as written by counter_word
+    low = word & 0xFF or 256
+    high = (word >> 8) & 0xFF or 256
+    bypass = (word >> 16) & 1
+    select = (word >> 18) & 0x1F
+    count = 1 if bypass else high + low
+    return count, select
+
+
+def _best_c(vco, freq):
+    c = min(max(round(vco / freq), 1), COUNTER_MAX)
+    return c, abs(vco / c - freq) / freq * 1e6
+
+
+def solve_pll(ref_clk, outputs, vco_min=VCO_MIN, vco_max=VCO_MAX,
+              pfd_min=PFD_MIN, pfd_max=PFD_MAX, k=1):
+    """Shared M/N plus one C counter per output, minimising the worst ppm error.
+
+    For each N allowed by the PFD range only the M values that keep the
+    VCO inside [vco_min, vco_max] are tried, and every C is the nearest
+    integer to VCO / fout, so the cost grows linearly with the number of
+    outputs. Returns up to k dicts sorted by worst-case error.
+    """
+    outputs = list(outputs)
+    if not 1 <= len(outputs) <= NUM_C_COUNTERS:
+        raise ValueError(f"Se admiten entre 1 y {NUM_C_COUNTERS} salidas")
+
+    best = []  # heap of (-worst, -vco, n, m, cs, errs)
+    n_max = min(COUNTER_MAX, floor(ref_clk / pfd_min))
+    for n in range(max(1, ceil(ref_clk / pfd_max)), n_max + 1):
+        m_lo = max(1, ceil(vco_min * n / ref_clk))
+        m_hi = min(COUNTER_MAX, floor(vco_max * n / ref_clk))
+        for m in range(m_lo, m_hi + 1):
+            if gcd(m, n) != 1:
+                continue  # same VCO already tried with a smaller N
+            vco = ref_clk * m / n
+            bound = -best[0][0] if len(best) == k else None
+            cs, errs = [], []
+            for freq in outputs:
+                c, err = _best_c(vco, freq)
+                if bound is not None and err > bound:
+                    break
+                cs.append(c)
+                errs.append(err)
+            else:
+                entry = (-max(errs), -vco, n, m, cs, errs)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+    results = []
+    for worst, vco, n, m, cs, errs in sorted(best, reverse=True):
+        results.append({
+            "m": m,
+            "n": n,
+            "vco": -vco,
+            "c": cs,
+            "freq": [-vco / c for c in cs],
+            "ppm": errs,
+            "worst_ppm": -worst,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula M, N y C0..C17 compartiendo un VCO")
+    parser.add_argument("ref_clk", type=float)
+    parser.add_argument("outputs", type=float, nargs="+", help="frecuencias de salida en MHz")
+    parser.add_argument("--vco-min", type=float, default=VCO_MIN)
+    parser.add_argument("--vco-max", type=float, default=VCO_MAX)
+    parser.add_argument("-k", "--top", type=int, default=1, help="numero de soluciones a mostrar")
+    args = parser.parse_args()
+
+    results = solve_pll(args.ref_clk, args.outputs, args.vco_min, args.vco_max, k=args.top)
+    if not results:
+        print("No hay solucion dentro del rango del VCO")
+        return
+    for sol in results:
+        print(f"M={sol['m']} (0x{counter_word(sol['m']):X}), N={sol['n']} (0x{counter_word(sol['n']):X}), "
+              f"VCO={sol['vco']:.6f}, worst={sol['worst_ppm']:.3f} ppm")
+        for idx, (target, c, freq, ppm) in enumerate(zip(args.outputs, sol["c"], sol["freq"], sol["ppm"])):
+            print(f"  C{idx}={c} (0x{counter_word(c, idx):X}) {freq:.6f} MHz (objetivo {target}, {ppm:.3f} ppm)")
+
+
+if __name__ == "__main__":
+    main()
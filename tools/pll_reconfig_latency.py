@@ -0,0 +1,81 @@
+import argparse
+
+from parse_mif import diff_instructions, parse_mif, trim_padding
+
+# Timing model, in mgmt_clk cycles (clk_74a in core_top.sv)
+MGMT_CLK = 74.25           # MHz
+PAUSE_CYCLES = 255         # 'reconfig' counter runs 1..255 before the first write
+ROM_READ_CYCLES = 2        # MIF streaming: address + registered ROM output
+WRITE_CYCLES = 1           # one Avalon-MM write per cycle while waitrequest is low
+DPRIO_RMW_CYCLES = 8       # read-modify-write through the DPRIO state machine
+LOCK_US = 1000.0           # worst-case fPLL lock time after reconfiguration
+
+# DPRIO read-modify-writes needed to apply each register once START is issued
+DPRIO_OPS = {
+    0x04: 3,  # M COUNTER: divider, bypass and odd bits
+    0x03: 3,  # N COUNTER
+    0x05: 3,  # C COUNTER
+    0x07: 2,  # M COUNTER FRACTION (two K words)
+    0x08: 1,  # BANDWIDTH
+    0x09: 1,  # CHARGE PUMP
+}
+
+
+def replay(instructions, mgmt_clk=MGMT_CLK, lock_us=LOCK_US, from_rom=True):
+    """Replay a parse_mif() stream and return a list of (step, cycles).
+
+    Register writes are accumulated until START RECONFIG (or END OF MIF
+    when streaming from the ROM); at that point the DPRIO work for every
+    pending register is charged, followed by the PLL lock time.
+    """
+    steps = [("PAUSE", PAUSE_CYCLES)]
+    pending = 0
+    read_cycles = ROM_READ_CYCLES if from_rom else 0
+    for opcode, value, label in instructions:
+        opcode_val = int(opcode, 2) & 0x3F
+        name = label or f"REG 0x{opcode_val:02X}"
+        if opcode_val == 0x3E:
+            steps.append((name, read_cycles))
+        elif opcode_val in (0x3F, 0x02):
+            words = 1 if value is None else 2
+            steps.append((name, words * read_cycles + WRITE_CYCLES))
+            steps.append(("DPRIO", pending * DPRIO_RMW_CYCLES))
+            pending = 0
+            steps.append(("LOCK", round(lock_us * mgmt_clk)))
+            if opcode_val == 0x3F:
+                break
+        else:
+            steps.append((name, 2 * read_cycles + WRITE_CYCLES))
+            pending += DPRIO_OPS.get(opcode_val, 0)
+    return steps
+
+
+def format_report(title, steps, mgmt_clk=MGMT_CLK):
+    total = sum(cycles for _, cycles in steps)
+    lines = [f"{title}:"]
+    for name, cycles in steps:
+        lines.append(f"  {name:<20} {cycles:>8}")
+    lines.append(f"  {'TOTAL':<20} {total:>8} ciclos ({total / mgmt_clk:.2f} us)")
+    return "\n".join(lines), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estima los ciclos de reconfiguracion del PLL a partir de un MIF")
+    parser.add_argument("mif_file", help="perfil destino")
+    parser.add_argument("--base", help="perfil activo antes del cambio (compara completo vs diferencial)")
+    parser.add_argument("--mgmt-clk", type=float, default=MGMT_CLK, help="reloj de gestion en MHz")
+    parser.add_argument("--lock-us", type=float, default=LOCK_US, help="tiempo de enganche del PLL en us")
+    args = parser.parse_args()
+
+    target = trim_padding(parse_mif(args.mif_file))
+    report, full = format_report("Completo", replay(target, args.mgmt_clk, args.lock_us), args.mgmt_clk)
+    print(report)
+    if args.base:
+        diff = diff_instructions(parse_mif(args.base), target)
+        report, partial = format_report("Diferencial", replay(diff, args.mgmt_clk, args.lock_us), args.mgmt_clk)
+        print(report)
+        print(f"Ahorro: {full - partial} ciclos ({(full - partial) / args.mgmt_clk:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import os
+
+import numpy as np
+from PIL import Image
+
+# Sizes used by the Pocket (width, height): core icon and platform image
+ICON_SIZE = (36, 36)
+PLATFORM_SIZE = (521, 165)
+KNOWN_SIZES = {w * h * 2: (w, h) for w, h in (ICON_SIZE, PLATFORM_SIZE)}
+
+# ITU-R 601 luma, same weights as PIL's convert("L")
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def to_gray(pixels):
+    """uint8 gray array from an L, LA, RGB or RGBA array. Transparency is composed over black."""
+    if pixels.ndim == 2:
+        return pixels
+    rgb = pixels[..., :3].astype(np.float32) if pixels.shape[2] >= 3 else pixels[..., :1].astype(np.float32)
+    gray = rgb @ LUMA if rgb.shape[2] == 3 else rgb[..., 0]
+    if pixels.shape[2] in (2, 4):
+        gray *= pixels[..., -1] / np.float32(255)
+    return np.clip(gray + 0.5, 0, 255).astype(np.uint8)
+
+
+def encode(gray):
+    """Pocket image bytes for an upright gray image.
+
+    The Pocket stores images rotated 90 degrees counter-clockwise, one
+    16-bit little-endian word per pixel with the brightness in the low
+    byte and the high byte left at 0.
+    """
+    return np.ascontiguousarray(np.rot90(gray, 1)).astype('<u2').tobytes()
+
+
+def decode(data, size=None):
+    """Upright uint8 gray image from Pocket image bytes; size is (width, height)."""
+    width, height = size or guess_size(len(data))
+    words = np.frombuffer(data, dtype='<u2')
+    if words.size != width * height:
+        raise ValueError(f"{len(data)} bytes no corresponden a {width}x{height}")
+    return np.rot90((words & 0xFF).astype(np.uint8).reshape(width, height), -1)
+
+
+def guess_size(nbytes):
+    if nbytes not in KNOWN_SIZES:
+        raise ValueError(f"Tamano desconocido ({nbytes} bytes); indique --size ANCHOxALTO")
+    return KNOWN_SIZES[nbytes]
+
+
+def load_png(path, size=None):
+    with Image.open(path) as img:
+        if img.mode not in ("L", "LA", "RGB", "RGBA"):
+            img = img.convert("RGBA")
+        if size and img.size != tuple(size):
+            img = img.resize(size, Image.LANCZOS)
+        return to_gray(np.asarray(img))
+
+
+def png_to_bin(src, dst, size=None):
+    gray = load_png(src, size)
+    with open(dst, 'wb') as f:
+        f.write(encode(gray))
+    return gray.shape[1], gray.shape[0]
+
+
+def bin_to_png(src, dst, size=None):
+    with open(src, 'rb') as f:
+        gray = decode(f.read(), size)
+    Image.fromarray(gray, "L").save(dst)
+    return gray.shape[1], gray.shape[0]
+
+
+def is_png(path, to_bin=None):
+    """Whether path is converted PNG -> .bin: from to_bin when given, otherwise from the extension."""
+    return path.lower().endswith(".png") if to_bin is None else to_bin
+
+
+def output_name(path, out_dir=None, to_bin=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = stem + (".bin" if is_png(path, to_bin) else ".png")
+    return os.path.join(out_dir if out_dir else os.path.dirname(path), name)
+
+
+def convert(path, dst=None, size=None, to_bin=None):
+    """Convert one file; without to_bin the direction comes from the extension (.png -> .bin, otherwise .bin -> .png)."""
+    dst = dst or output_name(path, to_bin=to_bin)
+    if is_png(path, to_bin):
+        return dst, png_to_bin(path, dst, size)
+    return dst, bin_to_png(path, dst, size)
+
+
+def expand_inputs(inputs, to_bin=True):
+    """Files given directly plus the .png (or .bin with to_bin=False) inside the given directories.
+
+    Directories are converted in one direction only: with icon.png and
+    icon.bin side by side, converting both would overwrite one with the
+    other.
+    """
+    ext = ".png" if to_bin else ".bin"
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(ext):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte imagenes PNG <-> .bin del Pocket (icon.bin, Platforms/_images)")
+    parser.add_argument("inputs", nargs="+", help="ficheros .png/.bin o directorios")
+    direction = parser.add_mutually_exclusive_group()
+    direction.add_argument("--to-bin", action="store_const", const=True, dest="to_bin",
+                           help="convertir PNG -> .bin (por defecto en directorios)")
+    direction.add_argument("--to-png", action="store_const", const=False, dest="to_bin",
+                           help="convertir .bin -> PNG")
+    parser.add_argument("-o", "--output", help="fichero de salida (una entrada) o directorio (varias)")
+    parser.add_argument("--size", type=parse_size,
+                        help="ANCHOxALTO; al leer .bin de tamano no estandar o para escalar un PNG")
+    parser.add_argument("--icon", action="store_const", const=ICON_SIZE, dest="size", help="36x36 (icon.bin)")
+    parser.add_argument("--platform", action="store_const", const=PLATFORM_SIZE, dest="size",
+                        help="521x165 (Platforms/_images)")
+    args = parser.parse_args()
+
+    files = list(expand_inputs(args.inputs, args.to_bin is not False))
+    single = len(files) == 1 and not os.path.isdir(args.inputs[0])
+    if args.output and not single:
+        os.makedirs(args.output, exist_ok=True)
+    sources = {os.path.realpath(path) for path in files}
+    errors = 0
+    for path in files:
+        dst = args.output if single and args.output else output_name(path, args.output, args.to_bin)
+        if os.path.realpath(dst) in sources:
+            print(f"{path}: {dst} es tambien una entrada; no se sobrescribe")
+            errors += 1
+            continue
+        try:
+            dst, (width, height) = convert(path, dst, args.size, args.to_bin)
+            print(f"{path} -> {dst} ({width}x{height})")
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            errors += 1
+    raise SystemExit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
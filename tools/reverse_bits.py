@@ -0,0 +1,60 @@
+import argparse
+import mmap
+import os
+import sys
+import time
+
+# Byte -> byte with its 8 bits in reverse order
+REVERSE_TABLE = bytes(int(f"{b:08b}"[::-1], 2) for b in range(256))
+CHUNK = 4 << 20
+
+
+def reverse_bytes(data):
+    return data.translate(REVERSE_TABLE)
+
+
+def reverse_file(src, dst, chunk=CHUNK):
+    """Write dst with every byte of src bit-reversed (same as reverse_bits.exe)."""
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        size = os.fstat(fin.fileno()).st_size
+        if not size:
+            return 0
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for pos in range(0, size, chunk):
+                fout.write(mm[pos:pos + chunk].translate(REVERSE_TABLE))
+    return size
+
+
+def benchmark(size_mb=16, repeat=5):
+    data = os.urandom(size_mb << 20)
+    best = min(_timed(reverse_bytes, data) for _ in range(repeat))
+    assert reverse_bytes(reverse_bytes(data)) == data
+    print(f"{size_mb} MiB en {best * 1e3:.2f} ms ({size_mb / best:.0f} MiB/s)")
+
+
+def _timed(fn, data):
+    start = time.perf_counter()
+    fn(data)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invierte los bits de cada byte del bitstream (.rbf -> .rbf_r)")
+    parser.add_argument("src", nargs="?")
+    parser.add_argument("dst", nargs="?")
+    parser.add_argument("--bench", type=int, metavar="MB", nargs="?", const=16,
+                        help="medir la conversion de un bloque aleatorio de MB megabytes")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.bench)
+        return
+    if not args.src or not args.dst:
+        parser.error("uso: reverse_bits.py entrada.rbf salida.rbf_r")
+    start = time.perf_counter()
+    size = reverse_file(args.src, args.dst)
+    print(f"{args.dst}: {size} bytes en {(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
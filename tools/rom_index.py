@@ -0,0 +1,140 @@
+import argparse
+import os
+import sqlite3
+import zipfile
+
+DEFAULT_DB = ".rom_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS zips (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    crc INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    zip_path TEXT NOT NULL REFERENCES zips(path) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_crc ON members(crc);
+CREATE INDEX IF NOT EXISTS members_zip ON members(zip_path);
+"""
+
+
+class RomIndex:
+    """Persistent CRC32 -> (zip, member) index of a ROM library.
+
+    Only zip central directories are read, and rescans skip every zip
+    whose size and mtime did not change.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+        self.open_zips = {}
+
+    def close(self):
+        for zf in self.open_zips.values():
+            zf.close()
+        self.open_zips = {}
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scan(self, rom_dir):
+        """Index every zip under rom_dir. Returns (updated, unchanged, removed) counts."""
+        rom_dir = os.path.abspath(rom_dir)
+        prefix = os.path.join(rom_dir, "")
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.db.execute("SELECT path, size, mtime_ns FROM zips WHERE substr(path, 1, ?) = ?",
+                                 (len(prefix), prefix))}
+        updated = unchanged = 0
+        seen = set()
+        with self.db:
+            for root, dirs, files in os.walk(rom_dir):
+                dirs.sort()
+                for name in sorted(files):
+                    if not name.lower().endswith(".zip"):
+                        continue
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    seen.add(path)
+                    if known.get(path) == (st.st_size, st.st_mtime_ns):
+                        unchanged += 1
+                        continue
+                    self._index_zip(path, st)
+                    updated += 1
+            removed = [path for path in known if path not in seen]
+            self.db.executemany("DELETE FROM zips WHERE path = ?", [(p,) for p in removed])
+        return updated, unchanged, len(removed)
+
+    def _index_zip(self, path, st):
+        self.db.execute("DELETE FROM zips WHERE path = ?", (path,))
+        try:
+            with zipfile.ZipFile(path) as zf:
+                rows = [(info.CRC, info.file_size, path, info.filename)
+                        for info in zf.infolist() if not info.is_dir()]
+        except zipfile.BadZipFile:
+            rows = []
+        self.db.execute("INSERT INTO zips (path, size, mtime_ns) VALUES (?, ?, ?)",
+                        (path, st.st_size, st.st_mtime_ns))
+        self.db.executemany("INSERT INTO members (crc, size, zip_path, name) VALUES (?, ?, ?, ?)", rows)
+
+    def lookup(self, crc, size=None):
+        """[(zip_path, name, size)] of every member with that CRC32 (hex string or int)."""
+        if isinstance(crc, str):
+            crc = int(crc, 16)
+        query = "SELECT zip_path, name, size FROM members WHERE crc = ?"
+        params = [crc]
+        if size is not None:
+            query += " AND size = ?"
+            params.append(size)
+        return self.db.execute(query + " ORDER BY zip_path, name", params).fetchall()
+
+    def find_member(self, crc, size=None):
+        """(ZipFile, ZipInfo) for a CRC, or None. The zips stay open until close()."""
+        for zip_path, name, _ in self.lookup(crc, size):
+            if not os.path.isfile(zip_path):
+                continue
+            if zip_path not in self.open_zips:
+                self.open_zips[zip_path] = zipfile.ZipFile(zip_path)
+            zf = self.open_zips[zip_path]
+            try:
+                return zf, zf.getinfo(name)
+            except KeyError:
+                continue
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indice CRC32 de una biblioteca de zips de ROMs")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"fichero del indice (por defecto {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    scan = sub.add_parser("scan", help="indexar (o reindexar) directorios")
+    scan.add_argument("dirs", nargs="+")
+    find = sub.add_parser("find", help="buscar uno o varios CRC32")
+    find.add_argument("crcs", nargs="+")
+    args = parser.parse_args()
+
+    with RomIndex(args.db) as index:
+        if args.cmd == "scan":
+            for rom_dir in args.dirs:
+                updated, unchanged, removed = index.scan(rom_dir)
+                print(f"{rom_dir}: {updated} zips indexados, {unchanged} sin cambios, {removed} eliminados")
+        else:
+            for crc in args.crcs:
+                hits = index.lookup(crc)
+                if not hits:
+                    print(f"{crc.lower()}  -")
+                for zip_path, name, size in hits:
+                    print(f"{crc.lower()}  {zip_path}|{name}  {size}")
+
+
+if __name__ == "__main__":
+    main()
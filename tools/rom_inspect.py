@@ -0,0 +1,183 @@
+import argparse
+import json
+import mmap
+import os
+import sys
+import zlib
+
+from mra_rom import map_layout, parse_mra
+
+# Board ID byte written by the MRAs as the first <part>
+BOARD_IDS = {
+    0x04: "Xain'd Sleena (bootleg)",
+    0x05: "Xain'd Sleena (bootleg, bugfixed)",
+}
+
+HEADER_SIZE = 4
+
+
+class RegionError(ValueError):
+    """A region header or payload runs past the end of the image."""
+
+    def __init__(self, message, region_id, offset, size):
+        super().__init__(message)
+        self.region_id = region_id
+        self.offset = offset
+        self.size = size
+
+
+def iter_regions(buf):
+    """Yield (region_id, header_offset, size) for each region after the board ID.
+
+    Every region starts with a 4-byte header: region number followed by
+    the payload size as a 24-bit big-endian value. Raises RegionError at
+    the first truncated region.
+    """
+    pos = 1
+    while pos < len(buf):
+        if pos + HEADER_SIZE > len(buf):
+            raise RegionError(f"Cabecera truncada en 0x{pos:X}", buf[pos], pos, None)
+        region_id = buf[pos]
+        size = int.from_bytes(buf[pos + 1:pos + HEADER_SIZE], "big")
+        if pos + HEADER_SIZE + size > len(buf):
+            raise RegionError(f"Region {region_id:02X} en 0x{pos:X} excede el fichero "
+                              f"({len(buf) - pos - HEADER_SIZE} de {size} bytes)", region_id, pos, size)
+        yield region_id, pos, size
+        pos += HEADER_SIZE + size
+
+
+def mra_regions(mra):
+    """MRA rom entries grouped like the image: [(header bytes, [slots])]."""
+    groups = []
+    for entry in mra["entries"]:
+        if "data" in entry:
+            groups.append((entry["data"], []))
+        elif groups:
+            groups[-1][1].append(entry)
+    return groups
+
+
+def check_parts(payload, slots):
+    """Compare the payload of a region with the parts the MRA puts there.
+
+    Parts without a length attribute are assumed to split the remaining
+    space evenly, which is how every region of our MRAs is laid out.
+    """
+    results = []
+    known = sum(slot.get("length", 0) * slot.get("repeat", 1) for slot in slots)
+    unsized = [slot for slot in slots if "length" not in slot]
+    default_size = (len(payload) - known) // len(unsized) if unsized else 0
+    pos = 0
+    for slot in slots:
+        size = slot.get("length", default_size) * slot.get("repeat", 1) if "interleave" not in slot else default_size
+        data = payload[pos:pos + size]
+        pos += size
+        if "interleave" in slot:
+            word_bytes = slot["interleave"] // 8
+            for part in slot["parts"]:
+                pairs, in_width = map_layout(part, word_bytes)
+                chunk = bytearray(len(data) // word_bytes * in_width)
+                for dst_byte, src_byte in pairs:
+                    chunk[src_byte::in_width] = data[dst_byte::word_bytes]
+                results.append((part, f"{zlib.crc32(chunk):08x}"))
+        else:
+            results.append((slot, f"{zlib.crc32(data[:len(data) // slot.get('repeat', 1)]):08x}"))
+    return results
+
+
+def inspect_rom(rom_file, mra_file=None):
+    """Board ID and per-region size/CRC32, plus expected vs actual parts if an MRA is given."""
+    report = {"file": rom_file, "regions": [], "ok": True}
+    with open(rom_file, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            report.update(board_id=None, board="fichero vacio", ok=False, error="Fichero vacio")
+            return report
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _inspect_image(mm, report, mra_file)
+    return report
+
+
+def _inspect_image(mm, report, mra_file):
+    board = mm[0]
+    report["board_id"] = board
+    report["board"] = BOARD_IDS.get(board, "desconocida")
+    groups = mra_regions(parse_mra(mra_file)) if mra_file else None
+    if groups is not None:
+        expected_board = groups[0][0] if groups and len(groups[0][0]) == 1 else None
+        report["board_ok"] = expected_board == bytes([board])
+        report["ok"] &= report["board_ok"]
+        groups = groups[1:]
+
+    regions = iter_regions(mm)
+    idx = 0
+    while True:
+        try:
+            region_id, offset, size = next(regions)
+        except StopIteration:
+            break
+        except RegionError as e:
+            # Truncated image: keep what was decoded and flag the broken region
+            report["regions"].append({"id": e.region_id, "offset": e.offset, "size": e.size,
+                                      "error": str(e), "ok": False})
+            report["ok"] = False
+            break
+        payload = memoryview(mm)[offset + HEADER_SIZE:offset + HEADER_SIZE + size]
+        region = {
+            "id": region_id,
+            "offset": offset,
+            "size": size,
+            "crc32": f"{zlib.crc32(payload):08x}",
+        }
+        if groups is not None:
+            header = bytes(mm[offset:offset + HEADER_SIZE])
+            if idx >= len(groups) or groups[idx][0] != header:
+                region["header_ok"] = False
+                report["ok"] = False
+            else:
+                region["header_ok"] = True
+                region["parts"] = []
+                for part, crc in check_parts(mm[offset + HEADER_SIZE:offset + HEADER_SIZE + size], groups[idx][1]):
+                    ok = part.get("crc") in (None, crc)
+                    region["parts"].append({"name": part.get("name"), "expected": part.get("crc"),
+                                            "actual": crc, "ok": ok})
+                    report["ok"] &= ok
+        payload.release()
+        report["regions"].append(region)
+        idx += 1
+    if groups is not None and len(groups) != len(report["regions"]):
+        report["ok"] = False
+
+
+def format_report(report):
+    if report["board_id"] is None:
+        return f"{report['file']}: {report['error']}\nResultado: ERRORES"
+    lines = [f"{report['file']}: placa {report['board_id']:02X} ({report['board']})"
+             + ("" if report.get("board_ok", True) else "  <- no coincide con el MRA")]
+    for region in report["regions"]:
+        if "error" in region:
+            lines.append(f"  region {region['id']:02X}  offset 0x{region['offset']:06X}  ERROR: {region['error']}")
+            continue
+        mark = "" if region.get("header_ok", True) else "  <- cabecera distinta al MRA"
+        lines.append(f"  region {region['id']:02X}  offset 0x{region['offset']:06X}  "
+                     f"tam 0x{region['size']:06X}  crc {region['crc32']}{mark}")
+        for part in region.get("parts", []):
+            estado = "OK" if part["ok"] else "MAL"
+            lines.append(f"    {estado:<4} {part['name'] or '-':<12} esperado {part['expected'] or '-'}  real {part['actual']}")
+    lines.append("Resultado: " + ("OK" if report["ok"] else "ERRORES"))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecciona un .rom montado y lo compara con un MRA")
+    parser.add_argument("rom_file")
+    parser.add_argument("--mra", help="MRA con las partes esperadas")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = inspect_rom(args.rom_file, args.mra)
+    print(json.dumps(report, indent=4) if args.json else format_report(report))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()